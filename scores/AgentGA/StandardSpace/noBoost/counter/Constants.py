@@ -41,6 +41,14 @@ ENVSIZE=(10,10)
 # standard space), otherwise it will be too difficult to avoid the enemy cars:
 CARSIZE=(2,2)         
 
+# Integer. Number of enemy cars on the road at the same time. Agents are always learned with a single enemy car,
+# while more enemy cars can be used to test them when playing the game:
+NENEMIES=1
+
+# Integer. Seed of the root random stream: every environment and agent draws its random numbers from an
+# independent stream spawned from it, hence runs with the same seed are reproducible:
+SEED=314
+
 
 
 #######################################################
@@ -50,6 +58,10 @@ CARSIZE=(2,2)
 # Boolean. If True, the environment is printed in the terminal at each step:
 PRINTSTEPS=False   
 
+# Float. Number of steps printed per second in the case PRINTSTEPS=True. 
+# Increase it to speed up the game, or set it to 0 to print the steps as fast as possible:
+FPS=1
+
 # Boolean. If True, the environment is plotted and animated 
 # (the animation won't stop until the user closes the plot):
 PLOTSTEPS=False
@@ -58,6 +70,10 @@ PLOTSTEPS=False
 # Increase it to slow down the animation:  
 WAIT=10
 
+# Integer. Number of steps played between two frames of the animation in the case PLOTSTEPS=True.
+# Increase it to speed up the game without increasing the frame rate:
+FRAMESKIP=1
+
 # number of games to be played after the agent has been learned/imported:
 NGAMES=1        
    
@@ -87,6 +103,51 @@ TOURNAMENTSIZE=7
 # Integer. Number of times the EA is repeated to evaluate the learning process
 NREPS=10
 
+# Integer. Number of processes used to compute the fitness of the individuals in parallel.
+# Leave it to 1 to compute it in the main process, or set it to 0 to use one process for each core:
+NWORKERS=1
+
+# Integer. Maximum number of fitness values kept in the cache, to avoid playing again the game of trees 
+# which have already been evaluated. Set it to 0 to disable the cache:
+FITNESSCACHESIZE=100000
+
+# Boolean. Decide if to save the fitness cache in a file, to reuse it in later runs with the same game:
+SAVEFITNESSCACHE=False
+
+# Boolean. If True, trees which take the same action in every state of the game are evaluated only once, 
+# since they obtain the same fitness:
+BEHAVIORSIGNATURES=True
+
+# Boolean. If True, the best individual is evaluated once in all the states of the game and stored in a table, 
+# so that its action is found with a single lookup at each step when playing the game:
+TABULATEAGENT=True
+
+# Boolean. If True, the trees are rewritten into smaller trees with the same behaviour (e.g. not_(not_(x)) -> x)
+# before computing their fitness and before compiling the best individual:
+SIMPLIFYTREES=True
+
+# Boolean. If True, the EA optimizes at the same time the global reward, the size of the trees and the cost of computing
+# their output with NSGA-II, keeping the Pareto front of the individuals, and the best individual is its knee point:
+MULTIOBJECTIVE=False
+
+# Integer. Number of islands of the island model, i.e. populations of POPSIZE individuals each which evolve in separate
+# processes and exchange their best individuals. Set it to 1 to evolve a single population:
+NISLANDS=1
+
+# Integer. Number of generations between two migrations of the individuals between the islands (at least 1):
+MIGRATIONINTERVAL=5
+
+# Integer. Number of individuals sent by each island at each migration (at most POPSIZE):
+MIGRATIONSIZE=2
+
+# String. Topology of the migrations: "ring" (each island sends its individuals to the next one) or "random" 
+# (each island receives the individuals of another island chosen at random at each migration):
+MIGRATIONTOPOLOGY="ring"
+
+# Integer. Number of generations between two checkpoints of the EA, saved in CHECKPOINTPATH: an interrupted run is resumed
+# from its last checkpoint when it is started again with the same configuration. Set it to 0 to disable the checkpoints:
+CHECKPOINTINTERVAL=0
+
 
 
 #######################################################
@@ -139,6 +200,19 @@ EXPORTTREE=True
 
 # Boolean. Decide if to save the scores in a file:   
 SAVESCORES=True                    
+
+# String. Folder where the precomputed state lookup tables are cached, one file for each game configuration:
+STATETABLEPATH="stateTables/"
+
+# Integer. Maximum size in bytes of the precomputed state lookup table: with larger environments the states are 
+# computed at each step instead of being looked up:
+STATETABLEMAXSIZE=50000000
+
+# String. Folder where the fitness caches are saved in the case SAVEFITNESSCACHE=True, one file for each game configuration:
+FITNESSCACHEPATH="fitnessCaches/"
+
+# String. Folder where the checkpoints of the EA are saved in the case CHECKPOINTINTERVAL>0, one file for each configuration:
+CHECKPOINTPATH="checkpoints/"
           
 
 
@@ -159,6 +233,8 @@ boost = "boost/" if BOOST>1 else "noBoost/"
 counter = "counter/" if COUNTER<MAXSCORE else "noCounter/"
 if USEGA:
     fileName = "pop{}_ngen{}_tsz{}.".format(POPSIZE,NGENERATIONS,TOURNAMENTSIZE)
+    if MULTIOBJECTIVE:
+        fileName = "nsga2_" + fileName
 else:
     fileName = "neps{}_epsz{}_thr{}_{}.".format(NEPISODES,EPSIZE,SCORETHRESHOLD,AGENT)
 agentPath = "agents/" + agent + isContSpace + boost + counter + fileName
@@ -0,0 +1,92 @@
+import numpy as np
+
+from TreeEvaluator import evaluateTree
+
+def outputToAction(output):
+    """
+    Convert the output of a compiled tree into an action: values close to 0 mean standing still, positive and negative 
+    values mean moving right and left, and values far from 0 mean using the boost
+    
+    Args:
+        output (float): the output of the tree
+    
+    Returns:
+        int: the action
+    """
+    return 0 if abs(output)<0.001 else 3 if output>3 else 4 if output<-3 else 1 if output>0 else 2
+
+def outputsToActions(outputs):
+    """
+    Convert many outputs of a tree into actions at once, with the same rules of outputToAction
+
+    Args:
+        outputs (np array): the outputs of the tree
+
+    Returns:
+        np array: the actions
+    """
+    with np.errstate(invalid="ignore"):
+        return np.select([np.abs(outputs)<0.001, outputs>3, outputs<-3, outputs>0], [0, 3, 4, 1], 2).astype(np.uint8)
+
+class ActionTable:
+    def __init__(self, states, actions):
+        """
+        Initialize an agent which plays by looking up its action in a table: the table has one dimension for each element
+        of the state, hence the action for a state is found with a single array index, whatever the agent it has been
+        built from. States which are not in the given ones are mapped to action 0 (stand still).
+
+        Args:
+            states (np array): the states where the action is known, one for each row
+            actions (int array): the action to take in each state
+        """
+        self.states = states
+        self.actions = np.asarray(actions, dtype=np.uint8)
+        # the table starts from the minimum value of each element of the state
+        self.offset = tuple(int(value) for value in states.min(axis=0))
+        self.table = np.zeros(states.max(axis=0) - states.min(axis=0) + 1, dtype=np.uint8)
+        self.table[tuple((states - states.min(axis=0)).T)] = self.actions
+
+    @classmethod
+    def fromFunction(cls, individualCompiled, states):
+        """
+        Build the action table of a compiled tree, by computing its action in each state once for all
+
+        Args:
+            individualCompiled (function): the compiled tree
+            states (np array): the states where to compute the actions, one for each row
+
+        Returns:
+            ActionTable: the action table
+        """
+        return cls(states, [outputToAction(individualCompiled(*state)) for state in states])
+
+    @classmethod
+    def fromTree(cls, tree, pset, states):
+        """
+        Build the action table of a tree, by computing its actions in all the states at once (see TreeEvaluator.evaluateTree)
+
+        Args:
+            tree (PrimitiveTree): the tree
+            pset (PrimitiveSetTyped): the primitive set of the tree
+            states (np array): the states where to compute the actions, one for each row
+
+        Returns:
+            ActionTable: the action table
+        """
+        return cls(states, outputsToActions(evaluateTree(tree, pset, states)))
+
+    def __call__(self, *state):
+        """
+        Return the action to be taken for the given state
+
+        Args:
+            state (array): the current state (given as a tuple of elements)
+
+        Returns:
+            int: the action, or 0 (stand still) if the state is outside the range of the table
+        """
+        index = tuple([value - offset for value, offset in zip(state, self.offset)])
+        # a negative index would wrap around the table, and a too large one would raise an IndexError
+        if all(0 <= i < size for i, size in zip(index, self.table.shape)):
+            return int(self.table[index])
+        return 0
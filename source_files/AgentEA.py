@@ -1,13 +1,138 @@
 from deap import base, creator, tools, gp, algorithms
 import operator
+import os
+import pickle
 import random
+import multiprocessing
+import zlib
+from functools import cached_property
 import numpy as np
 import pandas as pd
 import pygraphviz as pgv
 
 from Env import Env
 from Game import Game
-import Constants as C
+from ActionTable import ActionTable, outputsToActions
+from TreeEvaluator import evaluateTree
+from Simplifier import simplifyTree
+from Config import Config
+from FitnessCache import FitnessCache
+from RandomStreams import makeSeedSequence
+from StateTable import getStateTable
+
+# Primitive set and configuration of a worker process of the parallel evaluation, built once by initWorker
+workerPset = None
+workerConfig = None
+
+def makePrimitiveSet():
+    """
+    Build the primitive set for the genetic programming
+
+    Returns:
+        PrimitiveSetTyped: the primitive set
+    """
+    # A state is a tuple of 5 elements:
+    # - if the enemy car is in front of you                 (bool)
+    # - the vertical distance between you and the enemy car (float)
+    # - if the enemy car is on the left of you              (bool)
+    # - the distance from the closest obstacle on the left  (float)
+    # - the distance from the closest obstacle on the right (float)
+    # The computation of the state results in a float value which is then converted to an action
+    pset = gp.PrimitiveSetTyped("MAIN", [bool, float, bool, float, float], float, "IN")
+
+    def protectedInv(x):
+        return 1.0/x if x != 0 else 1  
+    def if_then_else(input, output1, output2):
+        return output1 if input else output2
+
+    # Define the primitives
+    pset.addPrimitive(operator.add, [float, float], float)
+    pset.addPrimitive(operator.sub, [float, float], float)
+    pset.addPrimitive(operator.mul, [float, float], float)
+    pset.addPrimitive(protectedInv, [float], float)
+
+    pset.addPrimitive(operator.and_, [bool, bool], bool)
+    pset.addPrimitive(operator.or_, [bool, bool], bool)
+    pset.addPrimitive(operator.not_, [bool], bool)
+
+    pset.addPrimitive(if_then_else, [bool, float, float], float)
+    pset.addPrimitive(operator.lt, [float, float], bool) # <
+    pset.addPrimitive(operator.eq, [float, float], bool) # ==
+    return pset
+
+# Relative cost of a call of each primitive of the primitive set, measured with the states of the game: arithmetic,
+# boolean and comparison operators are implemented in C, while if_then_else and protectedInv are Python functions,
+# and the latter also converts its argument to a float
+primitiveCosts = {
+    "add": 1, "sub": 1, "mul": 1, "and_": 1, "or_": 1, "lt": 1,
+    "not_": 2, "eq": 2,
+    "if_then_else": 3,
+    "protectedInv": 40,
+}
+
+def playEvaluationGame(individualCompiled, config, evaluationSeed):
+    """
+    Let a compiled individual play the game used to compute its fitness
+
+    Args:
+        individualCompiled (function): the compiled individual
+        config (Config): the configuration of the game
+        evaluationSeed (np.random.SeedSequence): the seed of the enemy cars
+
+    Returns:
+        float: the global reward obtained by the individual
+    """
+    # I have done some tests computing the fitness as the average reward over 10 games,
+    # but results were not significantly different and the computation was a lot slower
+    #reward = 0
+    # all the individuals play a game with the same enemy cars, so that their fitness only depends on their behaviour
+    env = Env(*config.ENVSIZE, *config.CARSIZE, headless=True, seed=evaluationSeed, config=config)
+    #for _ in range(10):
+    game = Game(env, individualCompiled, training=True, fastForward=True)
+    game.rollout()
+    #reward += game.globalReward
+    return game.globalReward #reward/10
+
+def initWorker(config):
+    """
+    Initialize a worker process of the parallel evaluation: the primitive set is built only once for each worker,
+    which then receives the individuals as strings
+
+    Args:
+        config (Config): the configuration of the games to play
+    """
+    global workerPset, workerConfig
+    workerPset = makePrimitiveSet()
+    workerConfig = config
+
+def evaluateTreeString(treeString, evaluationSeed):
+    """
+    Compute the fitness of an individual in a worker process (see AgentEA.buildToolBox)
+
+    Args:
+        treeString (string): the individual, written as a string
+        evaluationSeed (np.random.SeedSequence): the seed of the enemy cars
+
+    Returns:
+        tuple: the fitness of the individual
+    """
+    # the string is compiled directly, since simplified trees may hold integer constants which from_string rejects
+    return playEvaluationGame(gp.compile(treeString, workerPset), workerConfig, evaluationSeed),
+
+def runIsland(connection, config, seed, evaluationSeed, population, island):
+    """
+    Evolve an island of the island model in a worker process (see AgentEA.runIslands and AgentEA.evolveIsland)
+
+    Args:
+        connection (multiprocessing.Connection): the connection with the main process
+        config (Config): the configuration of the island
+        seed (np.random.SeedSequence): the seed of the random stream of the island
+        evaluationSeed (np.random.SeedSequence): the seed of the enemy cars of the evaluation games
+        population (list of strings): the initial population of the island, with each individual written as a string
+        island (int): the index of the island
+    """
+    agent = AgentEA(seed=seed, config=config, learn=False, island=island)
+    agent.evolveIsland(connection, evaluationSeed, population)
 
 
 class AgentEA():
@@ -16,60 +141,60 @@ class AgentEA():
     
     Args:
         individualPath (string, optional): the path of the file containing the individual to be imported. Defaults to None (build the individual from scratch)
+        seed (int or np.random.SeedSequence, optional): the seed of the random stream of the agent. Defaults to None (spawn a new stream from the root one)
+        config (Config, optional): the configuration of the agent and of the games it plays. Defaults to None (the one set in the Constants file)
+        learn (bool, optional): if False, only build the tools of the EA without learning the agent, e.g. for the islands of the island model. Defaults to True
+        island (int, optional): the index of the island, if the agent evolves an island of the island model. Defaults to None
     """
-    def __init__(self, individualPath=None):
+    def __init__(self, individualPath=None, seed=None, config=None, learn=True, island=None):
+        self.config = config if config is not None else Config()
+        self.seedSequence = makeSeedSequence(seed, self.config.SEED)
+        self.island = island
         # Build all the tools needed to run the EA
         self.buildPset()
-        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-        creator.create("Individual", gp.PrimitiveTree, fitness=creator.FitnessMax, pset=self.pset)
+        self.pool = self.buildPool() if individualPath is None and learn else None
+        self.fitnessCache = self.buildFitnessCache("trees")
+        self.signatureCache = self.buildFitnessCache("signatures")
+        # total number of nodes of the last evaluated individuals, before and after their simplification
+        self.nodesBefore = 0
+        self.nodesAfter = 0
+        if self.config.MULTIOBJECTIVE:
+            # maximize the global reward, minimize the size of the tree and the cost of computing its output
+            creator.create("FitnessMulti", base.Fitness, weights=(1.0, -1.0, -1.0))
+            creator.create("Individual", gp.PrimitiveTree, fitness=creator.FitnessMulti, pset=self.pset)
+        else:
+            creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+            creator.create("Individual", gp.PrimitiveTree, fitness=creator.FitnessMax, pset=self.pset)
         self.buildToolBox()
         self.buildStats()
         if individualPath is None:
             # No individual to import, learn the agent from scratch
             self.bestIndividual = None
             self.bestIndividualCompiled = None
-            self.learnAgent()   
+            if learn:
+                self.learnAgent()   
         else:
             # Import the agent from the specified file
             self.loadAgentFrom(individualPath)
         
     def compileBestIndividual(self):
         """
-        Compile the best individual to obtain a function that can be used to play the game
+        Compile the best individual to obtain a function that can be used to play the game. If SIMPLIFYTREES=True, 
+        the individual is simplified before (see Simplifier.simplifyTree). If TABULATEAGENT=True, the function is 
+        evaluated once in all the states of the game and replaced by an action table
         """
-        self.bestIndividualCompiled = self.toolbox.compile(self.bestIndividual)
+        tree = self.simplify(self.bestIndividual)
+        if self.config.SIMPLIFYTREES:
+            print("Best individual simplified from {} to {} nodes".format(len(self.bestIndividual), len(tree)))
+        self.bestIndividualCompiled = self.toolbox.compile(tree)
+        if self.config.TABULATEAGENT:
+            self.bestIndividualCompiled = ActionTable.fromTree(tree, self.pset, self.states)
     
     def buildPset(self):
         """
         Build the primitive set for the genetic programming. 
         """
-        # A state is a tuple of 5 elements:
-        # - if the enemy car is in front of you                 (bool)
-        # - the vertical distance between you and the enemy car (float)
-        # - if the enemy car is on the left of you              (bool)
-        # - the distance from the closest obstacle on the left  (float)
-        # - the distance from the closest obstacle on the right (float)
-        # The computation of the state results in a float value which is then converted to an action
-        self.pset = gp.PrimitiveSetTyped("MAIN", [bool, float, bool, float, float], float, "IN")
-
-        def protectedInv(x):
-            return 1.0/x if x != 0 else 1  
-        def if_then_else(input, output1, output2):
-            return output1 if input else output2
-
-        # Define the primitives
-        self.pset.addPrimitive(operator.add, [float, float], float)
-        self.pset.addPrimitive(operator.sub, [float, float], float)
-        self.pset.addPrimitive(operator.mul, [float, float], float)
-        self.pset.addPrimitive(protectedInv, [float], float)
-
-        self.pset.addPrimitive(operator.and_, [bool, bool], bool)
-        self.pset.addPrimitive(operator.or_, [bool, bool], bool)
-        self.pset.addPrimitive(operator.not_, [bool], bool)
-
-        self.pset.addPrimitive(if_then_else, [bool, float, float], float)
-        self.pset.addPrimitive(operator.lt, [float, float], bool) # <
-        self.pset.addPrimitive(operator.eq, [float, float], bool) # ==
+        self.pset = makePrimitiveSet()
 
     def buildToolBox(self):  
         """"
@@ -87,93 +212,758 @@ class AgentEA():
             Returns:
                 float: the fitness of the individual, given as the global reward obtained by it
             """
-            # I have done some tests computing the fitness as the average reward over 10 games,
-            # but results were not significantly different and the computation was a lot slower
-            #reward = 0
             individualCompiled = self.toolbox.compile(individual)
-            env = Env(*C.ENVSIZE, *C.CARSIZE)
-            #for _ in range(10):
-            game = Game(env, individualCompiled, training=True)
-            game.play()
-            #reward += game.globalReward
-            return game.globalReward,#reward/10,
-        
-        # Use user-defined fitness to evaluate the individuals
+            return playEvaluationGame(individualCompiled, self.config, self.evaluationSeed),
+        
+        # Use user-defined fitness to evaluate the individuals, through the fitness cache
         self.toolbox.register("evaluate", fitness)
+        self.toolbox.register("map", self.evaluateObjectives if self.config.MULTIOBJECTIVE else self.evaluatePopulation)
         # Use ramped half-and-half method to randomly generate the trees
-        self.toolbox.register("expr", gp.genHalfAndHalf, pset=self.pset, min_=C.MINTREESIZE, max_=C.MAXTREESIZE)
+        self.toolbox.register("expr", gp.genHalfAndHalf, pset=self.pset, min_=self.config.MINTREESIZE, max_=self.config.MAXTREESIZE)
         # Initialize a single individual and the population as a list of individuals
         self.toolbox.register("individual", tools.initIterate, creator.Individual, self.toolbox.expr)
         self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
         # Add a function to compile a readable tree into a usable Python function
         self.toolbox.register("compile", gp.compile, pset=self.pset)
         # Define the tools used in the EA for selection, crossover and mutation
-        self.toolbox.register("select", tools.selTournament, tournsize=C.TOURNAMENTSIZE)
+        if self.config.MULTIOBJECTIVE:
+            self.toolbox.register("select", tools.selNSGA2)
+        else:
+            self.toolbox.register("select", tools.selTournament, tournsize=self.config.TOURNAMENTSIZE)
         self.toolbox.register("mate", gp.cxOnePoint)
         self.toolbox.register("expr_mut", gp.genFull, min_=0, max_=2)
         self.toolbox.register("mutate", gp.mutUniform, expr=self.toolbox.expr_mut, pset=self.pset)
 
+    def buildPool(self):
+        """
+        Build the pool of worker processes used to compute the fitness of the individuals, with NWORKERS processes
+        (or one for each core, if NWORKERS=0). The same pool is used for all the generations and repetitions of the EA.
+        With the island model (NISLANDS>1) no pool is built, since the islands already evolve in separate processes
+        
+        Returns:
+            multiprocessing.Pool: the pool, or None if the individuals are evaluated in the main process (NWORKERS=1)
+        """
+        nWorkers = self.config.NWORKERS if self.config.NWORKERS > 0 else os.cpu_count()
+        if nWorkers == 1 or self.config.NISLANDS > 1:
+            return None
+        return multiprocessing.Pool(nWorkers, initializer=initWorker, initargs=(self.config,))
+    
+    def buildFitnessCache(self, name):
+        """
+        Build a cache of the fitness values, with FITNESSCACHESIZE values at most. If SAVEFITNESSCACHE=True, the cache
+        is loaded from and saved in a file inside FITNESSCACHEPATH, shared by all the configurations with the same game
+        (each island of the island model has its own file, so that the islands do not overwrite the caches of each other)
+        
+        Args:
+            name (string): the name of the cache, used in the name of its file
+        
+        Returns:
+            FitnessCache: the cache
+        """
+        file = None
+        if self.island is not None:
+            name = "{}_island{}".format(name, self.island)
+        if self.config.SAVEFITNESSCACHE:
+            file = self.config.FITNESSCACHEPATH + "{:08x}_{}.pkl".format(zlib.crc32(repr(self.config.gameKey()).encode()), name)
+        return FitnessCache(self.config.FITNESSCACHESIZE, file)
+    
+    def saveFitnessCaches(self):
+        """
+        Save the fitness caches in their files, if SAVEFITNESSCACHE=True. With the island model (NISLANDS>1) the caches
+        of the main process are not used: each island fills and saves its own caches
+        """
+        if self.config.NISLANDS == 1:
+            self.fitnessCache.save()
+            self.signatureCache.save()
+    
+    @cached_property
+    def states(self):
+        """
+        All the different states which can be reached in the game, where the behaviour of the individuals is compared
+        and the best individual is tabulated. They are computed only when they are first needed, i.e. with
+        BEHAVIORSIGNATURES=True or TABULATEAGENT=True, since the whole state table of the game has to be built
+        
+        Returns:
+            np array: a matrix with one state for each row (see reachableStates)
+        """
+        return self.reachableStates()
+    
+    def reachableStates(self):
+        """
+        Compute all the different states which can be reached in the game, i.e. the states of all the positions 
+        where the cars can be found (see Env.moveCar and Env.generateEnemyCar)
+        
+        Returns:
+            np array: a matrix with one state for each row
+        """
+        height, width = self.config.ENVSIZE
+        carWidth = self.config.CARSIZE[1]
+        stateTable = getStateTable(height, width, *self.config.CARSIZE, self.config)
+        maxPlayerPosition = width if self.config.CONTINUOUSENV else width - carWidth + 1
+        maxEnemyPosition  = width if self.config.CONTINUOUSENV else width - carWidth
+        return stateTable.allStates(maxPlayerPosition, maxEnemyPosition)
+    
+    def simplify(self, individual):
+        """
+        Simplify an individual if SIMPLIFYTREES=True (see Simplifier.simplifyTree)
+        
+        Args:
+            individual (DEAP tree): the individual
+        
+        Returns:
+            DEAP tree: the simplified tree, with the same behaviour of the individual, or the individual itself
+        """
+        return simplifyTree(individual, self.pset) if self.config.SIMPLIFYTREES else individual
+    
+    def behaviorSignature(self, individual):
+        """
+        Compute the behaviour of an individual, given by the actions it takes in all the states of the game: the game 
+        only depends on the actions taken, hence individuals with the same behaviour obtain the same fitness
+        
+        Args:
+            individual (DEAP tree): the individual
+        
+        Returns:
+            bytes: the actions taken in each state
+        """
+        return outputsToActions(evaluateTree(individual, self.pset, self.states)).tobytes()
+    
+    def evaluatePopulation(self, function, individuals):
+        """
+        Compute the fitness of the individuals: this function replaces the map used by the EA to apply toolbox.evaluate.
+        The fitness of an individual only depends on its tree, on the game and on the enemy cars, hence it is taken from 
+        the cache if the same tree has already been evaluated in the same game. Moreover, if BEHAVIORSIGNATURES=True, 
+        it is taken from the cache of signatures if a different tree with the same behaviour has already been evaluated 
+        (see behaviorSignature). The other individuals are evaluated in the worker processes, which compute the same 
+        fitness from the string of each individual, or in the main process. If SIMPLIFYTREES=True, the individuals are
+        simplified before all of this, hence trees with the same simplified form share the same fitness value.
+        
+        Args:
+            function (function): the fitness function (toolbox.evaluate)
+            individuals (list of DEAP trees): the individuals to evaluate
+            
+        Returns:
+            list of tuples: the fitness of each individual
+        """
+        evaluationKey = (self.config.gameKey(), self.evaluationSeed.entropy, self.evaluationSeed.spawn_key)
+        # the population keeps the original trees, while their simplified versions are evaluated
+        trees = [self.simplify(individual) for individual in individuals]
+        self.nodesBefore = sum(len(individual) for individual in individuals)
+        self.nodesAfter = sum(len(tree) for tree in trees)
+        keys = [(str(tree), *evaluationKey) for tree in trees]
+        fitnesses = [None]*len(individuals)
+        toEvaluate = {}     # index of the first individual with each key to evaluate
+        for i, key in enumerate(keys):
+            if key in toEvaluate:
+                # the same tree appears twice in the population: it is evaluated only once
+                self.fitnessCache.hits += 1
+            else:
+                fitnesses[i] = self.fitnessCache.get(key)
+                if fitnesses[i] is None:
+                    toEvaluate[key] = i
+        evaluated = {}      # fitness of each evaluated key
+        toPlay = {}         # keys of the trees to be evaluated by playing a game, grouped by behaviour
+        for key, i in toEvaluate.items():
+            if self.config.BEHAVIORSIGNATURES:
+                signatureKey = (self.behaviorSignature(trees[i]), *evaluationKey)
+                if signatureKey in toPlay:
+                    # the same behaviour appears twice in the population: it is evaluated only once
+                    self.signatureCache.hits += 1
+                else:
+                    evaluated[key] = self.signatureCache.get(signatureKey)
+                    if evaluated[key] is not None:
+                        continue
+            else:
+                signatureKey = key
+            toPlay.setdefault(signatureKey, []).append(key)
+        # play a game for the first tree of each group
+        playing = [toEvaluate[keysToPlay[0]] for keysToPlay in toPlay.values()]
+        if self.pool is not None:
+            newFitnesses = self.pool.starmap(evaluateTreeString, [(keys[i][0], self.evaluationSeed) for i in playing])
+        elif self.config.BEHAVIORSIGNATURES:
+            # the actions of the trees are already known in all the states: play the game with their action tables
+            newFitnesses = [(playEvaluationGame(ActionTable(self.states, np.frombuffer(signatureKey[0], dtype=np.uint8)), 
+                                                self.config, self.evaluationSeed),) for signatureKey in toPlay]
+        else:
+            newFitnesses = map(function, [trees[i] for i in playing])
+        for (signatureKey, keysToPlay), fitness in zip(toPlay.items(), newFitnesses):
+            if self.config.BEHAVIORSIGNATURES:
+                self.signatureCache.put(signatureKey, fitness)
+            for key in keysToPlay:
+                evaluated[key] = fitness
+        for key, fitness in evaluated.items():
+            self.fitnessCache.put(key, fitness)
+        return [fitness if fitness is not None else evaluated[key] for fitness, key in zip(fitnesses, keys)]
+
+    def evaluateObjectives(self, function, individuals):
+        """
+        Compute the objectives of the individuals if MULTIOBJECTIVE=True: this function replaces evaluatePopulation as 
+        the map used by the EA. The global reward is computed by evaluatePopulation (hence through the fitness caches),
+        while the size of the tree and its evaluation cost (see evaluationCost) are computed from the tree itself.
+        
+        Args:
+            function (function): the fitness function (toolbox.evaluate)
+            individuals (list of DEAP trees): the individuals to evaluate
+            
+        Returns:
+            list of tuples: the global reward, the size and the evaluation cost of each individual
+        """
+        rewards = self.evaluatePopulation(function, individuals)
+        return [(reward[0], len(individual), self.evaluationCost(individual)) for reward, individual in zip(rewards, individuals)]
+    
+    def evaluationCost(self, individual):
+        """
+        Estimate the time taken by the compiled individual (simplified if SIMPLIFYTREES=True) to compute its output,
+        as the sum of the relative costs of its primitives (see primitiveCosts). Unlike a measured time, the cost is
+        the same on every machine and in every run, hence it does not affect the reproducibility of the EA
+        
+        Args:
+            individual (DEAP tree): the individual
+        
+        Returns:
+            int: the evaluation cost of the individual
+        """
+        return sum(primitiveCosts.get(node.name, 0) for node in self.simplify(individual))
+    
+    def kneePoint(self, front):
+        """
+        Find the knee point of a Pareto front, i.e. the individual with the best trade-off between the global reward and
+        the evaluation cost (the size of the tree only controls the bloat, and it would favour cheap individuals twice): 
+        both objectives are normalized between 0 (the worst value in the front) and 1 (the best one), and the individual
+        farthest from the line joining the best individual in reward and the cheapest one, on the side of the ideal point
+        (1, 1), is chosen. Ties are broken in favour of the smallest tree
+        
+        Args:
+            front (ParetoFront): the Pareto front
+        
+        Returns:
+            DEAP tree: the individual at the knee point
+        """
+        # weighted values of reward and cost, which are larger for better individuals
+        values = np.array([individual.fitness.wvalues for individual in front])[:, [0, 2]]
+        span = values.max(axis=0) - values.min(axis=0)
+        normalized = (values - values.min(axis=0)) / np.where(span > 0, span, 1)
+        best = max(range(len(front)), key=lambda i: (values[i, 0], values[i, 1]))
+        cheapest = max(range(len(front)), key=lambda i: (values[i, 1], values[i, 0]))
+        direction = normalized[cheapest] - normalized[best]
+        length = np.hypot(*direction)
+        if length == 0:
+            # the best individual in reward is also the cheapest one
+            return front[best]
+        # signed distance from the line, positive on the side of the ideal point
+        offsets = normalized - normalized[best]
+        distances = (direction[1]*offsets[:, 0] - direction[0]*offsets[:, 1]) / length
+        return front[max(range(len(front)), key=lambda i: (distances[i], -front[i].fitness.values[1]))]
+    
     def buildStats(self):
         """
         Build the statistics to be computed during the EA
         """
-        # Track both the fitness and the size of the individuals...
-        fitness = tools.Statistics(lambda ind: ind.fitness.values)
+        # Track both the fitness (the global reward) and the size of the individuals...
+        fitness = tools.Statistics(lambda ind: ind.fitness.values[0])
         size = tools.Statistics(key=len)
-        self.mstats = tools.MultiStatistics(fitness=fitness, size=size)
+        chapters = {"fitness": fitness, "size": size}
+        if self.config.MULTIOBJECTIVE:
+            # ...and their evaluation cost, if it is optimized as well...
+            chapters["evalCost"] = tools.Statistics(lambda ind: ind.fitness.values[2])
+        self.mstats = tools.MultiStatistics(**chapters)
         # ...using the following functions
         self.mstats.register("min", np.min)
         self.mstats.register("avg", np.mean)
         self.mstats.register("max", np.max)
         self.mstats.register("std", np.std)
+        # Track also the number of fitness values taken from the cache of trees (hits) and not (misses), and the number of
+        # the missing ones taken from the cache of behaviours (signatureHits) and computed by playing a game (signatureMisses)
+        cache = tools.Statistics()
+        cache.register("hits", lambda population: self.fitnessCache.hits)
+        cache.register("misses", lambda population: self.fitnessCache.misses)
+        cache.register("signatureHits", lambda population: self.signatureCache.hits)
+        cache.register("signatureMisses", lambda population: self.signatureCache.misses)
+        self.mstats["cache"] = cache
+        # Track also the total number of nodes of the evaluated individuals, before and after their simplification
+        simplification = tools.Statistics()
+        simplification.register("nodesBefore", lambda population: self.nodesBefore)
+        simplification.register("nodesAfter", lambda population: self.nodesAfter)
+        self.mstats["simplification"] = simplification
+        self.fitnessCache.resetCounts()
+        self.signatureCache.resetCounts()
 
     def learnAgent(self):
         """
-        Learn the agent using a Evolutionary Algorithm (EA) with the parameters specified in the Toolbox and in the Constants file
+        Learn the agent using a Evolutionary Algorithm (EA) with the parameters specified in the Toolbox and in the configuration
         """
-        random.seed(314)
+        # DEAP draws its random numbers from the random module of the standard library: seed it from the stream of this agent
+        random.seed(int(self.seedSequence.generate_state(1)[0]))
+        self.evaluationSeed = self.seedSequence.spawn(1)[0]
         # Initialize the population and the hall of fame where to save the best individual
-        pop = self.toolbox.population(n = C.POPSIZE)
-        hof = tools.HallOfFame(1)
-        # if desired, save the statistics in a file
-        if C.SAVESCORES:
-            self.repeatEA(hof)
+        pop = self.toolbox.population(n = self.config.POPSIZE)
+        # with many objectives, keep all the individuals which are not dominated by any other (the Pareto front)
+        hof = tools.ParetoFront() if self.config.MULTIOBJECTIVE else tools.HallOfFame(1)
+        # resume the run from its last checkpoint, if it has been interrupted
+        checkpoint = self.loadCheckpoint()
+        try:
+            # if desired, save the statistics in a file
+            if self.config.SAVESCORES:
+                self.repeatEA(hof, checkpoint)
+            else:
+                # simply run the EA to learn and individual
+                self.repetition = 0
+                self.scoresList = []
+                self.runEA(pop, hof, checkpoint)
+            # the run is complete, its checkpoint is not needed anymore
+            self.removeCheckpoint()
+        finally:
+            # stop the workers, and save the fitness values computed so far
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                self.pool = None
+            self.saveFitnessCaches()
+        if self.config.MULTIOBJECTIVE:
+            self.paretoFront = hof
+            self.printParetoFront()
+            self.bestIndividual = self.kneePoint(hof)
         else:
-            # simply run the EA to learn and individual
-            algorithms.eaSimple(pop, self.toolbox, C.CXPROBABILITY, C.MUTPROBABILITY, C.NGENERATIONS, self.mstats, halloffame=hof, verbose=True)                
-        self.bestIndividual = hof[0]
+            self.bestIndividual = hof[0]
         self.compileBestIndividual()
 
-    def repeatEA(self, hof):
+    def runEA(self, pop, hof, checkpoint=None):
+        """
+        Run the EA on the population for NGENERATIONS generations, in the same way of eaSimple, or of NSGA-II if 
+        MULTIOBJECTIVE=True, where at each generation the parents and as many offspring compete for survival (with the 
+        selection of the toolbox). If CHECKPOINTINTERVAL>0, a checkpoint is saved every CHECKPOINTINTERVAL generations
+        and at the end of the run (see saveCheckpoint). If NISLANDS>1, the population is the one of the first island 
+        of the island model (see runIslands), which does not save checkpoints
+        
+        Args:
+            pop (list of DEAP trees): the initial population
+            hof (HallOfFame or ParetoFront): the archive where to store the best individuals
+            checkpoint (dict, optional): the checkpoint to resume the run from, which replaces the population. Defaults to None (start a new run)
+            
+        Returns:
+            list of DEAP trees, Logbook: the final population and the statistics of each generation
+        """
+        if self.config.NISLANDS > 1:
+            return self.runIslands(pop, hof)
+        if checkpoint is not None:
+            pop, logbook, generation = self.restoreCheckpoint(checkpoint, hof)
+        else:
+            logbook = tools.Logbook()
+            logbook.header = ["gen", "nevals"] + self.mstats.fields
+            nEvaluated = self.evaluateInvalid(pop)
+            hof.update(pop)
+            logbook.record(gen=0, nevals=nEvaluated, **self.mstats.compile(pop))
+            print(logbook.stream)
+            generation = 0
+        while generation < self.config.NGENERATIONS:
+            generation += 1
+            pop, nEvaluated = self.evolveGeneration(pop, hof)
+            logbook.record(gen=generation, nevals=nEvaluated, **self.mstats.compile(pop))
+            print(logbook.stream)
+            if self.config.CHECKPOINTINTERVAL > 0 and (generation % self.config.CHECKPOINTINTERVAL == 0 or generation == self.config.NGENERATIONS):
+                self.saveCheckpoint(generation, pop, hof, logbook)
+        return pop, logbook
+
+    def evolveGeneration(self, pop, hof):
+        """
+        Evolve the population for one generation, in the same way of eaSimple, or of eaMuPlusLambda if MULTIOBJECTIVE=True
+        
+        Args:
+            pop (list of DEAP trees): the population
+            hof (HallOfFame or ParetoFront): the archive where to store the best individuals
+            
+        Returns:
+            list of DEAP trees, int: the new population and the number of evaluated individuals
+        """
+        if self.config.MULTIOBJECTIVE:
+            offspring = algorithms.varOr(pop, self.toolbox, self.config.POPSIZE, self.config.CXPROBABILITY, self.config.MUTPROBABILITY)
+        else:
+            offspring = self.toolbox.select(pop, len(pop))
+            offspring = algorithms.varAnd(offspring, self.toolbox, self.config.CXPROBABILITY, self.config.MUTPROBABILITY)
+        nEvaluated = self.evaluateInvalid(offspring)
+        hof.update(offspring)
+        if self.config.MULTIOBJECTIVE:
+            return self.toolbox.select(pop + offspring, self.config.POPSIZE), nEvaluated
+        return offspring, nEvaluated
+    
+    def evaluateInvalid(self, individuals):
+        """
+        Compute the fitness of the individuals which have not been evaluated yet
+        
+        Args:
+            individuals (list of DEAP trees): the individuals
+            
+        Returns:
+            int: the number of evaluated individuals
+        """
+        invalid = [individual for individual in individuals if not individual.fitness.valid]
+        for individual, fitness in zip(invalid, self.toolbox.map(self.toolbox.evaluate, invalid)):
+            individual.fitness.values = fitness
+        return len(invalid)
+    
+    def selectBest(self, pop, n):
+        """
+        Select the best individuals of the population: the fittest ones, or the ones of the first Pareto fronts
+        if MULTIOBJECTIVE=True (with the selection of NSGA-II)
+        
+        Args:
+            pop (list of DEAP trees): the population
+            n (int): the number of individuals to select
+            
+        Returns:
+            list of DEAP trees: the selected individuals
+        """
+        return tools.selNSGA2(pop, n) if self.config.MULTIOBJECTIVE else tools.selBest(pop, n)
+    
+    def runIslands(self, pop, hof):
+        """
+        Run the EA with the island model: NISLANDS populations (the given one and new ones) evolve in separate processes 
+        (see evolveIsland), and every MIGRATIONINTERVAL generations the best MIGRATIONSIZE individuals of each island 
+        migrate to another island, chosen with MIGRATIONTOPOLOGY, replacing its worst individuals. The individuals are 
+        sent as strings together with their fitness, which is the same in all the islands since they play the same 
+        evaluation games. The statistics of the islands are merged into the ones of the whole population (see mergeRecords)
+        and their best individuals are collected in the given archive.
+        
+        Args:
+            pop (list of DEAP trees): the initial population of the first island
+            hof (HallOfFame or ParetoFront): the archive where to store the best individuals
+            
+        Returns:
+            list of DEAP trees, Logbook: the final population of all the islands and the statistics of each generation
+        """
+        # check the parameters of the migrations before any island is started
+        if self.config.MIGRATIONINTERVAL < 1:
+            raise ValueError("MIGRATIONINTERVAL must be at least 1, got {}".format(self.config.MIGRATIONINTERVAL))
+        if not 0 <= self.config.MIGRATIONSIZE <= self.config.POPSIZE:
+            raise ValueError("MIGRATIONSIZE must be between 0 and POPSIZE ({}), got {}".format(self.config.POPSIZE, self.config.MIGRATIONSIZE))
+        if self.config.MIGRATIONTOPOLOGY not in ("ring", "random"):
+            raise ValueError("Unknown migration topology: {}".format(self.config.MIGRATIONTOPOLOGY))
+        nIslands = self.config.NISLANDS
+        # the islands evaluate the individuals by themselves, in a single process each
+        islandConfig = self.config.replace(NISLANDS=1, NWORKERS=1)
+        populations = [pop] + [self.toolbox.population(n = self.config.POPSIZE) for _ in range(nIslands-1)]
+        rng = np.random.default_rng(self.seedSequence.spawn(1)[0])
+        logbook = tools.Logbook()
+        logbook.header = ["gen", "nevals"] + self.mstats.fields
+        connections = []
+        processes = []
+        try:
+            for island, (population, seed) in enumerate(zip(populations, self.seedSequence.spawn(nIslands))):
+                connection, islandConnection = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=runIsland, args=(islandConnection, islandConfig, seed, self.evaluationSeed, [str(individual) for individual in population], island))
+                process.start()
+                # close the end of the island in this process, so that recv fails if the island stops unexpectedly
+                islandConnection.close()
+                connections.append(connection)
+                processes.append(process)
+            # each island sends the statistics of the generations evolved since the last migration, its emigrants and its best individuals
+            replies = [connection.recv() for connection in connections]
+            for generation in range(0, self.config.NGENERATIONS, self.config.MIGRATIONINTERVAL):
+                self.collectIslands(replies, logbook, hof)
+                immigrants = self.migrate([emigrants for _, emigrants, _ in replies], rng) if generation > 0 else [[]]*nIslands
+                nGenerations = min(self.config.MIGRATIONINTERVAL, self.config.NGENERATIONS - generation)
+                for connection, islandImmigrants in zip(connections, immigrants):
+                    connection.send((islandImmigrants, nGenerations))
+                replies = [connection.recv() for connection in connections]
+            self.collectIslands(replies, logbook, hof)
+            # stop the islands and collect their final populations
+            pop = []
+            for connection in connections:
+                connection.send(None)
+                pop += [self.individualFromString(*individual) for individual in connection.recv()]
+            for process in processes:
+                process.join()
+        finally:
+            # stop the islands which are still running (e.g. after an error in this process), and wait for all of them
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in processes:
+                process.join()
+        return pop, logbook
+    
+    def evolveIsland(self, connection, evaluationSeed, population):
+        """
+        Evolve an island of the island model, communicating with the main process (see runIslands): the initial 
+        population is evaluated, then the island repeatedly receives its immigrants and the number of generations to 
+        evolve, and sends back the statistics of these generations, its emigrants and its best individuals, until it 
+        receives None and sends back its final population
+        
+        Args:
+            connection (multiprocessing.Connection): the connection with the main process
+            evaluationSeed (np.random.SeedSequence): the seed of the enemy cars of the evaluation games
+            population (list of strings): the initial population, with each individual written as a string
+        """
+        random.seed(int(self.seedSequence.generate_state(1)[0]))
+        self.evaluationSeed = evaluationSeed
+        pop = [creator.Individual.from_string(individual, self.pset) for individual in population]
+        hof = tools.ParetoFront() if self.config.MULTIOBJECTIVE else tools.HallOfFame(1)
+        nEvaluated = self.evaluateInvalid(pop)
+        hof.update(pop)
+        records = [{"gen": 0, "nevals": nEvaluated, **self.mstats.compile(pop)}]
+        generation = 0
+        while True:
+            emigrants = self.selectBest(pop, self.config.MIGRATIONSIZE)
+            connection.send((records, [self.individualToString(individual) for individual in emigrants], [self.individualToString(individual) for individual in hof]))
+            message = connection.recv()
+            if message is None:
+                break
+            immigrants, nGenerations = message
+            if len(immigrants) > 0:
+                # the immigrants replace the worst individuals of the island
+                pop = self.selectBest(pop, len(pop) - len(immigrants)) + [self.individualFromString(*individual) for individual in immigrants]
+            records = []
+            for _ in range(nGenerations):
+                generation += 1
+                pop, nEvaluated = self.evolveGeneration(pop, hof)
+                records.append({"gen": generation, "nevals": nEvaluated, **self.mstats.compile(pop)})
+        self.saveFitnessCaches()
+        connection.send([self.individualToString(individual) for individual in pop])
+    
+    def migrate(self, emigrants, rng):
+        """
+        Choose the immigrants of each island according to MIGRATIONTOPOLOGY: with "ring" the island i receives the
+        emigrants of the island i-1, with "random" it receives the emigrants of another island chosen at random
+        
+        Args:
+            emigrants (list of lists): the emigrants of each island
+            rng (np.random.Generator): the random generator used to choose the islands
+            
+        Returns:
+            list of lists: the immigrants of each island
+        """
+        nIslands = len(emigrants)
+        if self.config.MIGRATIONTOPOLOGY == "ring":
+            return [emigrants[i-1] for i in range(nIslands)]
+        if self.config.MIGRATIONTOPOLOGY == "random":
+            return [emigrants[(i + rng.integers(1, nIslands)) % nIslands] for i in range(nIslands)]
+        raise ValueError("Unknown migration topology: {}".format(self.config.MIGRATIONTOPOLOGY))
+    
+    def collectIslands(self, replies, logbook, hof):
+        """
+        Record the merged statistics of the generations evolved by the islands, and store their best individuals in the archive
+        
+        Args:
+            replies (list of tuples): the statistics, the emigrants and the best individuals sent by each island
+            logbook (Logbook): the logbook of the whole population
+            hof (HallOfFame or ParetoFront): the archive where to store the best individuals
+        """
+        for records in zip(*[islandRecords for islandRecords, _, _ in replies]):
+            logbook.record(**self.mergeRecords(records))
+            print(logbook.stream)
+        hof.update([self.individualFromString(*individual) for _, _, best in replies for individual in best])
+    
+    def mergeRecords(self, records):
+        """
+        Merge the statistics of the same generation of all the islands into the statistics of the whole population:
+        minimum and maximum of min and max, mean of avg, standard deviation of the whole population from avg and std 
+        (all the islands have the same size), and sum of the others (e.g. the number of evaluations and of cache hits)
+        
+        Args:
+            records (list of dicts): the statistics of each island
+            
+        Returns:
+            dict: the statistics of the whole population
+        """
+        merged = {"gen": records[0]["gen"], "nevals": sum(record["nevals"] for record in records)}
+        for chapter in self.mstats:
+            stats = [record[chapter] for record in records]
+            merged[chapter] = {}
+            for name in stats[0]:
+                values = np.array([islandStats[name] for islandStats in stats])
+                if name == "min":
+                    merged[chapter][name] = values.min()
+                elif name == "max":
+                    merged[chapter][name] = values.max()
+                elif name == "avg":
+                    merged[chapter][name] = values.mean()
+                elif name == "std":
+                    averages = np.array([islandStats["avg"] for islandStats in stats])
+                    merged[chapter][name] = np.sqrt(max(np.mean(values**2 + averages**2) - averages.mean()**2, 0))
+                else:
+                    merged[chapter][name] = values.sum()
+        return merged
+    
+    def individualToString(self, individual):
+        """
+        Write an individual as a string, together with its fitness, to send it to another process
+        
+        Args:
+            individual (DEAP tree): the individual
+            
+        Returns:
+            string, tuple: the string of the individual and its fitness
+        """
+        return str(individual), individual.fitness.values
+    
+    def individualFromString(self, string, fitness):
+        """
+        Build an individual from its string and its fitness (see individualToString)
+        
+        Args:
+            string (string): the string of the individual
+            fitness (tuple): the fitness of the individual
+            
+        Returns:
+            DEAP tree: the individual
+        """
+        individual = creator.Individual.from_string(string, self.pset)
+        individual.fitness.values = fitness
+        return individual
+    
+    def checkpointFile(self):
+        """
+        Return the file where the checkpoints of the EA are saved, inside CHECKPOINTPATH: a different file is used
+        for each configuration, so that a run is only resumed with the same configuration
+        
+        Returns:
+            string: the path of the file
+        """
+        return self.config.CHECKPOINTPATH + "{:08x}.pkl".format(zlib.crc32(repr(self.config.key()).encode()))
+    
+    def saveCheckpoint(self, generation, pop, hof, logbook):
+        """
+        Save a checkpoint of the EA, holding everything needed to continue the run exactly as if it had not been 
+        interrupted: the current repetition and generation, the population and the best individuals (as strings, 
+        together with their fitness), the logbook, the scores of the completed repetitions, the states of the random 
+        generators, the seed sequences and the fitness caches. The same individual can appear more than once in the 
+        population (varOr copies the parents by reference), and the selection of NSGA-II depends on it since it stores 
+        the crowding distance in the fitness of each individual: the position of the first occurrence of each 
+        individual is saved as well. The checkpoint is written in a temporary file and then renamed, so that an 
+        interruption never leaves a partial checkpoint
+        
+        Args:
+            generation (int): the last completed generation
+            pop (list of DEAP trees): the population
+            hof (HallOfFame or ParetoFront): the archive of the best individuals
+            logbook (Logbook): the statistics of the generations completed so far
+        """
+        firstOccurrence = {}
+        checkpoint = {
+            "repetition": self.repetition,
+            "scoresList": self.scoresList,
+            "generation": generation,
+            "population": [self.individualToString(individual) for individual in pop],
+            "aliases": [firstOccurrence.setdefault(id(individual), i) for i, individual in enumerate(pop)],
+            "hof": [self.individualToString(individual) for individual in hof],
+            "logbook": logbook,
+            "randomState": random.getstate(),
+            "numpyState": np.random.get_state(),
+            "seedSequence": self.seedSequence,
+            "evaluationSeed": self.evaluationSeed,
+            "fitnessCache": self.fitnessCache,
+            "signatureCache": self.signatureCache,
+            "nodes": (self.nodesBefore, self.nodesAfter),
+        }
+        file = self.checkpointFile()
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        temporaryFile = "{}.{}.tmp".format(file, os.getpid())
+        with open(temporaryFile, "wb") as f:
+            pickle.dump(checkpoint, f)
+        os.replace(temporaryFile, file)
+    
+    def loadCheckpoint(self):
+        """
+        Load the last checkpoint of the run, if CHECKPOINTINTERVAL>0 and a checkpoint has been saved with the same configuration
+        
+        Returns:
+            dict: the checkpoint (see saveCheckpoint), or None if there is no checkpoint to resume the run from
+        """
+        if self.config.CHECKPOINTINTERVAL == 0 or self.config.NISLANDS > 1 or not os.path.exists(self.checkpointFile()):
+            return None
+        with open(self.checkpointFile(), "rb") as f:
+            checkpoint = pickle.load(f)
+        print("Resuming from the checkpoint of generation", checkpoint["generation"], "of evaluation", checkpoint["repetition"]+1)
+        return checkpoint
+    
+    def restoreCheckpoint(self, checkpoint, hof):
+        """
+        Restore the state of the EA saved in a checkpoint (see saveCheckpoint)
+        
+        Args:
+            checkpoint (dict): the checkpoint
+            hof (HallOfFame or ParetoFront): the archive where to restore the best individuals
+            
+        Returns:
+            list of DEAP trees, Logbook, int: the population, the statistics and the last completed generation
+        """
+        pop = []
+        for i, (individual, alias) in enumerate(zip(checkpoint["population"], checkpoint["aliases"])):
+            pop.append(pop[alias] if alias < i else self.individualFromString(*individual))
+        hof.clear()
+        hof.update([self.individualFromString(*individual) for individual in checkpoint["hof"]])
+        random.setstate(checkpoint["randomState"])
+        np.random.set_state(checkpoint["numpyState"])
+        self.seedSequence = checkpoint["seedSequence"]
+        self.evaluationSeed = checkpoint["evaluationSeed"]
+        self.fitnessCache = checkpoint["fitnessCache"]
+        self.signatureCache = checkpoint["signatureCache"]
+        self.nodesBefore, self.nodesAfter = checkpoint["nodes"]
+        return pop, checkpoint["logbook"], checkpoint["generation"]
+    
+    def removeCheckpoint(self):
+        """
+        Remove the checkpoint of the run, if it has been saved
+        """
+        if self.config.CHECKPOINTINTERVAL > 0 and os.path.exists(self.checkpointFile()):
+            os.remove(self.checkpointFile())
+    
+    def printParetoFront(self):
+        """
+        Print the objectives of the individuals in the Pareto front, sorted by global reward
+        """
+        print("\nPARETO FRONT ({} individuals)".format(len(self.paretoFront)))
+        print("reward      size  evalCost")
+        for individual in sorted(self.paretoFront, key=lambda ind: -ind.fitness.values[0]):
+            print("{:<10.2f}  {:<4.0f}  {:.0f}".format(*individual.fitness.values))
+
+    def repeatEA(self, hof, checkpoint=None):
         """
         Repeat the EA for a set number of times and saves the average statistics in the set file
         
         Args:
             hof (HallOfFame): the hall of fame to store the best individual
+            checkpoint (dict, optional): the checkpoint to resume the repetitions from. Defaults to None (start from the first repetition)
         """
         # Write a header file to save info about the run
-        f=open(C.SAVESCORESPATH + "csv",'w')
-        comments="# Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}\n".format(C.SPEED,C.BOOST,C.CONTINUOUSENV,C.ENVSIZE,C.CARSIZE,C.COUNTER)
+        f=open(self.config.SAVESCORESPATH + "csv",'w')
+        comments="# Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}\n".format(self.config.SPEED,self.config.BOOST,self.config.CONTINUOUSENV,self.config.ENVSIZE,self.config.CARSIZE,self.config.COUNTER)
         f.write(comments)
         f.close()
-        scoresList = []
-        for i in range(C.NREPS):
-            print("\nEVALUATION", i+1, "OF", C.NREPS)
-            # Generate the population from scratch
-            pop = self.toolbox.population(n = C.POPSIZE)
+        # the scores of the completed repetitions are kept in the checkpoints
+        self.scoresList = [] if checkpoint is None else checkpoint["scoresList"]
+        firstRepetition = 0 if checkpoint is None else checkpoint["repetition"]
+        for i in range(firstRepetition, self.config.NREPS):
+            print("\nEVALUATION", i+1, "OF", self.config.NREPS)
+            self.repetition = i
+            pop = None
+            if checkpoint is None:
+                # Generate the population from scratch
+                pop = self.toolbox.population(n = self.config.POPSIZE)
+                # Play the evaluation games of this repetition with new enemy cars, unless the fitness caches are saved:
+                # in this case all the repetitions play the games of the run (see learnAgent), so that the fitness values
+                # computed in a repetition, or saved by a previous run, are reused by the others
+                if not self.config.SAVEFITNESSCACHE:
+                    self.evaluationSeed = self.seedSequence.spawn(1)[0]
             # Reset the statistics
             self.buildToolBox()
             self.buildStats()
-            # Run the EA and return the logbook with the statistics
-            pop, logbook = algorithms.eaSimple(pop, self.toolbox, C.CXPROBABILITY, C.MUTPROBABILITY, C.NGENERATIONS, self.mstats, halloffame=hof, verbose=True)
+            # Run the EA (resuming it from the checkpoint, if any) and return the logbook with the statistics
+            pop, logbook = self.runEA(pop, hof, checkpoint)
+            checkpoint = None
             logbook.header = "gen", "nevals", "fitness", "size"
             logbook.chapters["fitness"].header = "min", "avg", "max"
             logbook.chapters["size"].header = "min", "avg", "max"
-            scoresList.append(self.convertLogBookToDataframe(logbook))
+            logbook.chapters["cache"].header = "hits", "misses", "signatureHits", "signatureMisses"
+            logbook.chapters["simplification"].header = "nodesBefore", "nodesAfter"
+            if self.config.MULTIOBJECTIVE:
+                logbook.chapters["evalCost"].header = "min", "avg", "max"
+            self.scoresList.append(self.convertLogBookToDataframe(logbook))
+            self.saveFitnessCaches()
         # create a new dataframe with the mean values of the scores
-        meanScores = sum(scoresList)/C.NREPS
+        meanScores = sum(self.scoresList)/self.config.NREPS
         # save the mean scores in the specified file
-        meanScores.to_csv(C.SAVESCORESPATH + "csv", mode='a', header=True, index=False)
+        meanScores.to_csv(self.config.SAVESCORESPATH + "csv", mode='a', header=True, index=False)
         
         
     def convertLogBookToDataframe(self, logbook):
@@ -192,7 +982,12 @@ class AgentEA():
         colsToDrop = ["gen", "nevals"]
         fitness = pd.DataFrame(logbook.chapters["fitness"]).drop(columns = colsToDrop).rename(columns=dict(zip(cols, fitnessCols)))
         size    = pd.DataFrame(logbook.chapters["size"]).drop(columns = colsToDrop).rename(columns=dict(zip(cols, sizeCols)))
-        return pd.concat([base, fitness, size], axis=1)   
+        cache   = pd.DataFrame(logbook.chapters["cache"]).drop(columns = colsToDrop).add_prefix("cache_")
+        simplification = pd.DataFrame(logbook.chapters["simplification"]).drop(columns = colsToDrop).add_prefix("simplification_")
+        chapters = [base, fitness, size, cache, simplification]
+        if "evalCost" in logbook.chapters:
+            chapters.append(pd.DataFrame(logbook.chapters["evalCost"]).drop(columns = colsToDrop).add_prefix("evalCost_"))
+        return pd.concat(chapters, axis=1)   
         
     
     def saveTreeImageIn(self,file):
@@ -1,24 +1,34 @@
 import numpy as np
 
-import Constants as C
+from Config import Config
 from Env import Env
 from Game import Game
+from RandomStreams import makeSeedSequence
 
 class AgentRL():
     """
     Agent class that uses the Temporal Difference Control model to train and play the game
     """
-    def __init__(self,individualPath=None):
+    def __init__(self,individualPath=None,seed=None,config=None):
         """
         Initialize the agent by training it or importing it from the given path, and set the parameters for the epsilon-greedy policy.
-        """
-        assert C.AGENT in ['SARSA','Qlearning','ExpectedSARSA'], "Algorithm not recognized"
-        self.gamma = C.GAMMA                 # discount factor
-        self.spaceSize = (2,5,2,4,4)         # size of the states space
-        self.actionSize = 5                  # number of possible actions
-        self.learningRate = C.LEARNING_RATE  # learning rate
-        self.algorithm = C.AGENT             # algorithm to be used: SARSA, Qlearning, ExpectedSARSA
-        self.eps = C.EPSILON                 # epsilon for the epsilon-greedy policy
+        
+        Args:
+            individualPath (string, optional): the path of the file containing the policy to be imported. Defaults to None (learn the policy from scratch)
+            seed (int or np.random.SeedSequence, optional): the seed of the random stream of the agent. Defaults to None (spawn a new stream from the root one)
+            config (Config, optional): the configuration of the agent and of the games it plays. Defaults to None (the one set in the Constants file)
+        """
+        self.config = config if config is not None else Config()
+        assert self.config.AGENT in ['SARSA','Qlearning','ExpectedSARSA'], "Algorithm not recognized"
+        self.gamma = self.config.GAMMA                                # discount factor
+        self.spaceSize = (2,5,2,4,4)                                  # size of the states space
+        self.actionSize = 5                                           # number of possible actions
+        self.learningRate = self.config.LEARNING_RATE                 # learning rate
+        self.algorithm = self.config.AGENT                            # algorithm to be used: SARSA, Qlearning, ExpectedSARSA
+        self.eps = self.config.EPSILON                                # epsilon for the epsilon-greedy policy
+        self.epsDecay = self.config.EPSDECAY                          # epsilon decay factor
+        self.seedSequence = makeSeedSequence(seed, self.config.SEED)  # the environments used for training spawn their streams from this one
+        self.rng = np.random.default_rng(self.seedSequence)           # random generator for the epsilon-greedy policy
         # if no policy is imported, initialize Qvalues to 0
         if individualPath is None:
             self.Qvalues = np.zeros( (*self.spaceSize, self.actionSize) )
@@ -73,7 +83,7 @@ class AgentRL():
         """
         Learn the agent using the TDControl model
         """
-        if C.SAVESCORES:
+        if self.config.SAVESCORES:
             self.repeatRL()
         else:
             self.singleRL()
@@ -83,16 +93,16 @@ class AgentRL():
         """
         Repeat the RL for a set number of times and save the scores in a file
         """
-        env = Env(*C.ENVSIZE, *C.CARSIZE)
-        f=open(C.SAVESCORESPATH + "csv",'w')        
+        env = Env(*self.config.ENVSIZE, *self.config.CARSIZE, headless=True, seed=self.seedSequence.spawn(1)[0], config=self.config)
+        f=open(self.config.SAVESCORESPATH + "csv",'w')        
         # Write a header in the file where the scores are saved
-        comments="# Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}\n".format(C.SPEED,C.BOOST,C.CONTINUOUSENV,C.ENVSIZE,C.CARSIZE,C.COUNTER)
-        for episode in range(C.NEPISODES):
-            print("\nEVALUATION", episode+1, "OF", C.NEPISODES)
+        comments="# Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}\n".format(self.config.SPEED,self.config.BOOST,self.config.CONTINUOUSENV,self.config.ENVSIZE,self.config.CARSIZE,self.config.COUNTER)
+        for episode in range(self.config.NEPISODES):
+            print("\nEVALUATION", episode+1, "OF", self.config.NEPISODES)
             f.write(comments)
             self.Qvalues = np.zeros( (*self.spaceSize, self.actionSize) )
             # Play for a number of games equal to the episode size
-            for _ in range(C.EPSIZE):
+            for _ in range(self.config.EPSIZE):
                 game = Game(env, self, training=True)
                 game.play()
                 f.write(str(game.maxscore)+"\n")
@@ -101,18 +111,18 @@ class AgentRL():
         """
         Repeat the RL for a set number of times and stop the learning if the mean score overcomes the threshold
         """
-        env = Env(*C.ENVSIZE, *C.CARSIZE)
-        for episode in range(C.NEPISODES):
+        env = Env(*self.config.ENVSIZE, *self.config.CARSIZE, headless=True, seed=self.seedSequence.spawn(1)[0], config=self.config)
+        for episode in range(self.config.NEPISODES):
             totalScore = 0
             # Play for a number of games equal to the episode size
-            for _ in range(C.EPSIZE):
+            for _ in range(self.config.EPSIZE):
                 game = Game(env, self, training=True)
                 game.play()
                 totalScore += game.maxscore
-            meanScoreEpisode = totalScore/C.EPSIZE
+            meanScoreEpisode = totalScore/self.config.EPSIZE
             print("Mean score for episode",episode,":",meanScoreEpisode)   
             # stop the learning if the mean score overcomes the threshold             
-            if meanScoreEpisode >= C.SCORETHRESHOLD:
+            if meanScoreEpisode >= self.config.SCORETHRESHOLD:
                 break
         
                  
@@ -123,7 +133,7 @@ class AgentRL():
         Args:
             state (array): the current state (given as a tuple of elements)
         """
-        if np.random.rand() < self.eps: 
+        if self.rng.random() < self.eps: 
             # random action, with uniform probability, with probability eps
             prob_actions = np.ones(self.actionSize) / self.actionSize   
         else:
@@ -132,8 +142,8 @@ class AgentRL():
             best_actions = (self.Qvalues[ (*state,) ] == best_value) # in case there is more than one best action...
             prob_actions = best_actions / np.sum(best_actions)
         # reduce the epsilon for the epsilon-greedy policy, to make the agent more greedy at each step
-        self.eps*=C.EPSDECAY
-        return np.random.choice(self.actionSize, p=prob_actions)  
+        self.eps*=self.epsDecay
+        return self.rng.choice(self.actionSize, p=prob_actions)  
         
     def saveAgentIn(self, file): 
         """
@@ -143,7 +153,7 @@ class AgentRL():
             file (string): the name of the file where to save the policy
         """
         # A header is added to the file, containing the parameters used for training
-        comments="Algorithm: {}, Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}, Gamma: {}, LearnRate: {}, Eps: {}, Epsdecay: {}".format(C.AGENT,C.SPEED,C.BOOST,C.CONTINUOUSENV,C.ENVSIZE,C.CARSIZE,C.COUNTER,C.GAMMA,C.LEARNING_RATE,C.EPSILON,C.EPSDECAY)
+        comments="Algorithm: {}, Speed: {}, Boost: {}, ContEnv: {}, Env size: {}, Car size: {}, Counter: {}, Gamma: {}, LearnRate: {}, Eps: {}, Epsdecay: {}".format(self.config.AGENT,self.config.SPEED,self.config.BOOST,self.config.CONTINUOUSENV,self.config.ENVSIZE,self.config.CARSIZE,self.config.COUNTER,self.config.GAMMA,self.config.LEARNING_RATE,self.config.EPSILON,self.config.EPSDECAY)
         onedimension_Qvalues=np.reshape(self.Qvalues, np.prod(self.spaceSize)*self.actionSize)
         np.savetxt(file,onedimension_Qvalues,header=comments)
     
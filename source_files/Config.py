@@ -0,0 +1,110 @@
+import Constants as C
+
+# Paths of the files, which are always derived from the other parameters (see setPaths)
+PATHNAMES = ("IMPORTAGENTPATH", "EXPORTAGENTPATH", "EXPORTTREEPATH", "SAVESCORESPATH")
+
+class Config:
+    def __init__(self, **values):
+        """
+        Initialize a configuration of the project, holding the same parameters of the Constants file as attributes
+        (e.g. config.ENVSIZE). A configuration is passed to the environments, the games and the agents, so that
+        different configurations can be used at the same time in a single process. Parameters which are not given
+        are taken from the Constants file, and the paths of the files are computed from the other parameters.
+        A configuration should not be modified after it has been built: use replace() to build a modified copy.
+
+        Args:
+            **values: the parameters to set, with the same names used in the Constants file
+        """
+        for name, value in vars(C).items():
+            if name.isupper():
+                setattr(self, name, value)
+        for name, value in values.items():
+            setattr(self, name, value)
+        self.setPaths()
+
+    @classmethod
+    def fromFile(cls, file):
+        """
+        Load a configuration from a Constants file, such as the ones saved in the scores folder. Parameters missing
+        in the file are taken from the Constants file of the project
+
+        Args:
+            file (string): the path of the file
+
+        Returns:
+            Config: the configuration
+        """
+        namespace = {}
+        with open(file, "r") as f:
+            exec(compile(f.read(), file, "exec"), namespace)
+        return cls(**{name: value for name, value in namespace.items() if name.isupper() and name not in PATHNAMES})
+
+    def replace(self, **values):
+        """
+        Build a copy of the configuration with some parameters changed
+
+        Args:
+            **values: the parameters to change
+
+        Returns:
+            Config: the new configuration
+        """
+        return Config(**{**self.asDict(), **values})
+
+    def setPaths(self):
+        """
+        Set the paths of the agent and scores files according to the parameters, following the routine of the Constants file
+        """
+        agent = "AgentGA/" if self.USEGA else "AgentRL/"
+        isContSpace = "ContinuousSpace/" if self.CONTINUOUSENV else "StandardSpace/"
+        boost = "boost/" if self.BOOST>1 else "noBoost/"
+        counter = "counter/" if self.COUNTER<self.MAXSCORE else "noCounter/"
+        if self.USEGA:
+            fileName = "pop{}_ngen{}_tsz{}.".format(self.POPSIZE,self.NGENERATIONS,self.TOURNAMENTSIZE)
+            if self.MULTIOBJECTIVE:
+                fileName = "nsga2_" + fileName
+        else:
+            fileName = "neps{}_epsz{}_thr{}_{}.".format(self.NEPISODES,self.EPSIZE,self.SCORETHRESHOLD,self.AGENT)
+        agentPath = "agents/" + agent + isContSpace + boost + counter + fileName
+        scorePath = "scores/" + agent + isContSpace + boost + counter + fileName
+        self.IMPORTAGENTPATH = agentPath + "txt"
+        self.EXPORTAGENTPATH = agentPath + "txt"
+        self.EXPORTTREEPATH  = agentPath + "pdf"
+        self.SAVESCORESPATH  = scorePath
+
+    def asDict(self):
+        """
+        Return the parameters of the configuration, except the paths of the files
+
+        Returns:
+            dict: the parameters, with their names as keys
+        """
+        return {name: value for name, value in vars(self).items() if name not in PATHNAMES}
+
+    def gameKey(self):
+        """
+        Return a hashable summary of the parameters which define the game played by the agents, e.g. to compare the 
+        fitness of the same individual computed with different configurations of the algorithms
+
+        Returns:
+            tuple: the values of the parameters of the game
+        """
+        return (self.ENVSIZE, self.CARSIZE, self.SPEED, self.BOOST, self.COUNTER, self.MAXSCORE, self.CONTINUOUSENV, self.USEGA)
+
+    def key(self):
+        """
+        Return a hashable summary of the configuration, e.g. to use it as a key of a dictionary
+
+        Returns:
+            tuple: the sorted couples (name, value) of the parameters
+        """
+        return tuple(sorted(self.asDict().items()))
+
+    def __eq__(self, other):
+        return isinstance(other, Config) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return "Config({})".format(", ".join("{}={!r}".format(name, value) for name, value in self.key()))
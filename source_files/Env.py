@@ -1,9 +1,22 @@
 import numpy as np
 
-import Constants as C
+from Config import Config
+from RandomStreams import makeGenerator, copyGenerator
+from StateTable import getStateTable
+from TerminalRenderer import buildFrame
+
+# Number of enemy car positions drawn at once from the random generator
+SPAWNBATCHSIZE = 1024
 
 class Env:
-    def __init__(self, height, width, carHeight, carWidth):
+    # True if Game.skipIdleSteps can move the enemy car directly, skipping the idle steps of the game
+    supportsFastForward = True
+    # fixed set of attributes: no per-instance dictionary, smaller objects and faster attribute access
+    __slots__ = ("envHeight", "envWidth", "carHeight", "carWidth", "headless", "config", "continuousEnv", "useGA", "speed", "boost",
+                 "stateTable", "streetMatrix", "rng", "spawnPositions", "spawnIndex", 
+                 "playerPosition", "enemy_x_position", "enemy_y_position", "cachedState")
+    
+    def __init__(self, height, width, carHeight, carWidth, headless=False, seed=None, config=None):
         """
         Initialize the environment by setting the height and width of the environment and the 
         height and width of the cars, which we assume to be all equal. 
@@ -14,16 +27,104 @@ class Env:
             width (int): the environment width
             carHeight (int): the cars height
             carWidth (int): the cars width            
+            headless (bool, optional): if True, the street matrix is not updated at each step, and it is 
+                built only when it is requested (e.g. to print or plot the environment). Defaults to False
+            seed (int or np.random.SeedSequence, optional): the seed of the random generator of the environment. 
+                Defaults to None (spawn a new independent stream from the root one)
+            config (Config, optional): the configuration of the game. Defaults to None (the one set in the Constants file)
         """
         self.envHeight = height                                
         self.envWidth = width                                 
         self.carHeight = carHeight                            
         self.carWidth = carWidth                             
-        self.street = np.zeros((height, width), dtype=int)          # initialize the environment as a matrix of zeros
+        self.headless = headless
+        # game configuration, frozen at construction so that each step only reads attributes of the instance
+        self.config = config if config is not None else Config()
+        self.continuousEnv = self.config.CONTINUOUSENV
+        self.useGA = self.config.USEGA
+        self.speed = self.config.SPEED
+        self.boost = self.config.BOOST
+        self.stateTable = getStateTable(height, width, carHeight, carWidth, self.config)  # precomputed states for each position of the cars
+        # initialize the environment as a matrix of zeros, one byte per cell (only if it has to be kept updated)
+        self.streetMatrix = None if headless else np.zeros((height, width), dtype=np.uint8)
+        self.setSeed(seed)
+        self.reset()
+        
+    def setSeed(self, seed=None):
+        """
+        Build a new random generator for the environment, used to generate the enemy cars
+        
+        Args:
+            seed (int or np.random.SeedSequence, optional): the seed of the random generator. 
+                Defaults to None (spawn a new independent stream from the root one)
+        """
+        self.rng = makeGenerator(seed, self.config.SEED)
+        # enemy positions are drawn in batches: force a new batch to be drawn from the new generator
+        self.spawnPositions = np.empty(0, dtype=int)
+        self.spawnIndex = 0
+        
+    def reset(self, seed=None):
+        """
+        Restore the initial state of the environment in place, without allocating a new one: 
+        your car in the center of the last row and a new enemy car in the first row.
+        
+        Args:
+            seed (int or np.random.SeedSequence, optional): the seed used to build a new random generator before generating the enemy car. 
+                Defaults to None (keep the current random generator)
+        """
+        if seed is not None:
+            self.setSeed(seed)
+        if not self.headless:
+            self.streetMatrix.fill(0)
         self.playerPosition = (self.envWidth - self.carWidth) // 2  # position your car in the center of the last row
         self.renderCar(1)                                      
         self.generateEnemyCar()                              
         
+    def snapshot(self):
+        """
+        Save the current state of the environment: car positions and random state. The street matrix is not saved, 
+        since it can be rebuilt from the car positions
+        
+        Returns:
+            tuple: the snapshot, to be passed to restore()
+        """
+        # the batch of enemy positions is never modified in place, hence it can be saved by reference
+        return (self.playerPosition, self.enemy_x_position, self.enemy_y_position, 
+                self.spawnPositions, self.spawnIndex, self.rng.bit_generator.state)
+    
+    def restore(self, snapshot):
+        """
+        Restore a state of the environment saved with snapshot()
+        
+        Args:
+            snapshot (tuple): the snapshot to restore
+        """
+        (self.playerPosition, self.enemy_x_position, self.enemy_y_position, 
+         self.spawnPositions, self.spawnIndex, self.rng.bit_generator.state) = snapshot
+        self.cachedState = None
+        if not self.headless:
+            self.streetMatrix.fill(0)
+            self.renderCar(1)
+            self.renderEnemyCar(1)
+    
+    def clone(self):
+        """
+        Build a copy of the environment in its current state, which then evolves independently from this one. 
+        The configuration and the state table are shared, while the random generator is copied, hence the copy 
+        will generate the same enemy cars as this environment
+        
+        Returns:
+            Env: the copy of the environment
+        """
+        env = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for attribute in getattr(cls, "__slots__", ()):
+                setattr(env, attribute, getattr(self, attribute))
+        env.rng = copyGenerator(self.rng)
+        if not self.headless:
+            env.streetMatrix = self.streetMatrix.copy()
+        return env
+        
     def renderCar(self,placeOrRemove): 
         """
         Render the car inside the environment.
@@ -31,36 +132,77 @@ class Env:
         Args:
             placeOrRemove (bool): 1 to place the car, 0 to remove it
         """
-        for i in range(self.carHeight):
-            # compute the current line to render
-            currentLine = self.envHeight - 1 - i
-            for j in range(self.carWidth):
-                # use %self.width to account for the possibility of car to exit the environment from one side and re-enter from the opposite side
-                self.street[currentLine, (self.playerPosition+j)%self.envWidth] = placeOrRemove
+        if self.headless:
+            return
+        # your car occupies the last carHeight rows
+        self.renderBlock(self.streetMatrix, self.envHeight - self.carHeight, self.playerPosition, placeOrRemove)
     
-    def renderEnemyCar(self,placeOrRemove): 
+    def renderEnemyCar(self,placeOrRemove,street=None): 
         """
         Render the enemy car inside the environment.
         
         Args: 
             placeOrRemove (bool): 1 to place the car, 0 to remove it
+            street (np array, optional): the matrix where to render the car. Defaults to None (the street matrix of the environment)
+        """
+        if street is None:
+            if self.headless:
+                return
+            street = self.streetMatrix
+        self.renderBlock(street, self.enemy_y_position, self.enemy_x_position, placeOrRemove)
+        
+    def renderBlock(self, street, row, column, placeOrRemove):
+        """
+        Render a car in the given matrix, updating a row slice for each line of the car
+        
+        Args:
+            street (np array): the matrix where to render the car
+            row (int): the highest row of the car
+            column (int): the leftmost column of the car
+            placeOrRemove (bool): 1 to place the car, 0 to remove it
         """
-        # if enemy car is near the end, render only the part of the car that is still inside the environment
-        highestPosition = min(self.carHeight, self.envHeight - self.enemy_y_position)
-        for i in range(highestPosition): 
-            for j in range(self.carWidth):
-                # use %self.width to account for the possibility of car to exit the environment from one side and re-enter from the opposite side
-                self.street[self.enemy_y_position + i, (self.enemy_x_position + j)%self.envWidth] = placeOrRemove
+        # if the car is near the start or the end, render only the part of the car that is inside the environment
+        lastRow = row + self.carHeight
+        if lastRow <= 0:
+            return
+        row = max(row, 0)
+        lastColumn = column + self.carWidth
+        street[row:lastRow, column:lastColumn] = placeOrRemove
+        if lastColumn > self.envWidth:
+            # the car exits the environment from the right side and re-enters from the left one
+            street[row:lastRow, :lastColumn - self.envWidth] = placeOrRemove
     
+    @property
+    def street(self):
+        """
+        The environment as an int matrix, with 1 in the cells occupied by a car and 0 elsewhere.
+        The matrix is kept updated as a compact uint8 matrix and converted when it is requested. In headless mode
+        it is not kept updated at all, hence it is built from the car positions each time it is requested
+        
+        Returns:
+            np array: the street matrix
+        """
+        if not self.headless:
+            return self.streetMatrix.astype(int)
+        street = np.zeros((self.envHeight, self.envWidth), dtype=int)
+        self.renderBlock(street, self.envHeight - self.carHeight, self.playerPosition, 1)
+        self.renderEnemyCar(1, street)
+        return street
+        
     def generateEnemyCar(self): 
         """
         Initialize the enemy car in a random position of the first row
         """
         # position enemy in the first row...
         self.enemy_y_position = 0
-        maxValidPosition = self.envWidth if C.CONTINUOUSENV else self.envWidth - self.carWidth   
-        # ... in a random position
-        self.enemy_x_position = np.random.randint(maxValidPosition) 
+        # ... in a random position, taken from the batch of pre-sampled positions (draw a new batch if it is exhausted)
+        if self.spawnIndex == len(self.spawnPositions):
+            maxValidPosition = self.envWidth if self.continuousEnv else self.envWidth - self.carWidth   
+            self.spawnPositions = self.rng.integers(maxValidPosition, size=SPAWNBATCHSIZE)
+            self.spawnIndex = 0
+        self.enemy_x_position = int(self.spawnPositions[self.spawnIndex])
+        self.spawnIndex += 1
+        self.cachedState = None
         self.renderEnemyCar(1)
         
     def enemyDistance(self):
@@ -73,7 +215,7 @@ class Env:
         # The following code computes the distance between the left side of your car and the right side of the enemy car,
         # and the distance between the right side of your car and the left side of the enemy car.
         # These distances are quite hard to compute and some reasoning is needed to understand the code.
-        if C.CONTINUOUSENV:
+        if self.continuousEnv:
             leftEnemyDistance  = (self.playerPosition - self.enemy_x_position)%self.envWidth - self.carWidth
             rightEnemyDistance = (self.enemy_x_position - self.playerPosition)%self.envWidth - self.carWidth
         else:
@@ -92,8 +234,8 @@ class Env:
             int, int: left and right wall distance
         """
         # If the environment is continuous, the distance from the walls is the whole width of the environment (which is like infinity)
-        leftWallDistance  = self.envWidth if C.CONTINUOUSENV else self.playerPosition
-        rightWallDistance = self.envWidth if C.CONTINUOUSENV else self.envWidth - (self.playerPosition + self.carWidth)
+        leftWallDistance  = self.envWidth if self.continuousEnv else self.playerPosition
+        rightWallDistance = self.envWidth if self.continuousEnv else self.envWidth - (self.playerPosition + self.carWidth)
         return leftWallDistance, rightWallDistance
 
     
@@ -109,6 +251,7 @@ class Env:
         """
         gameover = False
         scoreIncrease = 0
+        self.cachedState = None
         # remove old enemy
         self.renderEnemyCar(0) 
         # compute the future position of the enemy car
@@ -134,6 +277,18 @@ class Env:
                     self.generateEnemyCar()       
         return gameover, scoreIncrease
                           
+    def shiftEnemyCar(self, rows):
+        """
+        Move the enemy car down by the given number of rows, without checking for crashes or exits
+        
+        Args:
+            rows (int): the number of rows
+        """
+        self.cachedState = None
+        self.renderEnemyCar(0)
+        self.enemy_y_position += rows
+        self.renderEnemyCar(1)
+    
     def moveCar(self, action, carspeed):
         """
         Move your car along the horizontal axis, following the given action, and return the game status
@@ -145,7 +300,8 @@ class Env:
         Returns:
             bool: if the game is over (car crashed against the wall)
         """
-        return self.moveCarContEnv(action, carspeed) if C.CONTINUOUSENV else self.moveCarStdEnv(action, carspeed)      
+        self.cachedState = None
+        return self.moveCarContEnv(action, carspeed) if self.continuousEnv else self.moveCarStdEnv(action, carspeed)      
     
     
     def moveCarStdEnv(self, action, carspeed): 
@@ -182,16 +338,16 @@ class Env:
                 else:
                     gameover=True       
             case 3: #right with boost 
-                if self.playerPosition + self.carWidth + C.BOOST*carspeed <= self.envWidth:   
+                if self.playerPosition + self.carWidth + self.boost*carspeed <= self.envWidth:   
                     self.renderCar(0)
-                    self.playerPosition += C.BOOST*carspeed
+                    self.playerPosition += self.boost*carspeed
                     self.renderCar(1)
                 else:
                     gameover=True 
             case 4: #left with boost 
-                if self.playerPosition - C.BOOST*carspeed >= 0:   
+                if self.playerPosition - self.boost*carspeed >= 0:   
                     self.renderCar(0)
-                    self.playerPosition -= C.BOOST*carspeed
+                    self.playerPosition -= self.boost*carspeed
                     self.renderCar(1)   
                 else:
                     gameover=True         
@@ -222,9 +378,9 @@ class Env:
             case 2: #left
                 self.playerPosition = (self.playerPosition - carspeed)%self.envWidth 
             case 3: # right with boost
-                self.playerPosition = (self.playerPosition + C.BOOST*C.SPEED)%self.envWidth   
+                self.playerPosition = (self.playerPosition + self.boost*self.speed)%self.envWidth   
             case 4: # left with boost
-                self.playerPosition = (self.playerPosition - C.BOOST*C.SPEED)%self.envWidth       
+                self.playerPosition = (self.playerPosition - self.boost*self.speed)%self.envWidth       
         self.renderCar(1)
         # game is never over in this case: you can't crash with the wall
         return False
@@ -239,9 +395,9 @@ class Env:
         Returns:
             int: the converted distance
         """
-        return 0 if distance < C.SPEED else \
-               1 if distance < 2*C.SPEED else \
-               2 if distance < 2*C.BOOST*C.SPEED else \
+        return 0 if distance < self.speed else \
+               1 if distance < 2*self.speed else \
+               2 if distance < 2*self.boost*self.speed else \
                3
             
     def sideObstacles(self):
@@ -259,7 +415,7 @@ class Env:
         # return the distance of the closest obstacle on the left and on the right
         # Notice that we are in a continuous environment, walls will always be farther than the enemy car 
         # (hence obstacleLeftDistance==leftEnemyDistance and obstacleRightDistance==rightEnemyDistance)
-        if not C.USEGA:
+        if not self.useGA:
             # Bin the distance if using RL, to avoid a too large state space
             obstacleLeftDistance, obstacleRightDistance = self.bin(obstacleLeftDistance), self.bin(obstacleRightDistance)
         return [obstacleLeftDistance, obstacleRightDistance]
@@ -278,48 +434,34 @@ class Env:
         # Boolean value that tells if the enemy car is on the left of the car 
         # (hence, if it is False the enemy is on the right)
         enemyLeftOrRight = (self.enemy_x_position < self.playerPosition)
-        if not C.USEGA:
+        if not self.useGA:
             # Bin the distance if using RL, to avoid a too large state space
-            b = 0 if self.carWidth%(C.BOOST*C.SPEED)==0 else 1
-            c = 0 if self.carWidth%C.SPEED==0 else 1
-            enemyVerticalDistance = 0 if enemyInFront and (enemyVerticalDistance < C.SPEED) else \
-                                    1 if enemyInFront and (enemyVerticalDistance < 2*C.SPEED) else \
-                                    2 if enemyInFront and (enemyVerticalDistance < self.carWidth//(C.BOOST*C.SPEED)+b) else \
-                                    3 if enemyInFront and (enemyVerticalDistance < self.carWidth//C.SPEED+c) else \
+            b = 0 if self.carWidth%(self.boost*self.speed)==0 else 1
+            c = 0 if self.carWidth%self.speed==0 else 1
+            enemyVerticalDistance = 0 if enemyInFront and (enemyVerticalDistance < self.speed) else \
+                                    1 if enemyInFront and (enemyVerticalDistance < 2*self.speed) else \
+                                    2 if enemyInFront and (enemyVerticalDistance < self.carWidth//(self.boost*self.speed)+b) else \
+                                    3 if enemyInFront and (enemyVerticalDistance < self.carWidth//self.speed+c) else \
                                     4
         return [enemyInFront, enemyVerticalDistance, enemyLeftOrRight]
      
     def getState(self): 
         """
-        Return the state of the environment: a quintuple (enemyInFront, enemyVerticalDistance, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance)
+        Return the state of the environment: a quintuple (enemyInFront, enemyVerticalDistance, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance).
+        The state is extracted from the state lookup table, which contains the same values computed by frontObstacles() and sideObstacles()
+        
+        The state is computed once after each change of the car positions, and then reused until the next change.
         
         Returns:
             np array: the state of the environment
         """
-        return np.array((*self.frontObstacles(), *self.sideObstacles()), dtype=int)
+        if self.cachedState is None:
+            self.cachedState = self.stateTable.state(self.playerPosition, self.enemy_x_position, self.enemy_y_position)
+        return self.cachedState
     
     def __str__(self): 
         """
         Print the environment on terminal as a grid
         """
-        # copy paste symbols: https://www.w3.org/TR/xml-entity-names/025.html
-        res = "┏"
-        for i in range(self.envWidth-1):
-            res += "━━━┳"
-        res += "━━━┓\n"
-        for i in range(self.envHeight):
-            for j in range(self.envWidth):
-                res += "┃ █ " if self.street[i,j] == 1 else "┃   "
-            res += "┃\n"
-            if i!=self.envHeight-1:
-                res += "┣"
-                for i in range(self.envWidth-1):
-                    res += "━━━╋"
-                res += "━━━┫\n"
-            else: 
-                res += "┗"
-                for i in range(self.envWidth-1):
-                    res += "━━━┻"
-                res += "━━━┛\n"
-        return res
+        return buildFrame(self.street)
     
\ No newline at end of file
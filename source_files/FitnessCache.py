@@ -0,0 +1,83 @@
+from collections import OrderedDict
+import os
+import pickle
+
+class FitnessCache:
+    def __init__(self, maxSize, file=None):
+        """
+        Initialize a Least Recently Used (LRU) cache of fitness values: when the cache is full, the value which has
+        not been used for the longest time is removed to make room for a new one. The number of fitness values found
+        in the cache (hits) and computed by playing a game (misses) is counted, to be reported in the statistics.
+
+        Args:
+            maxSize (int): the maximum number of values to keep. Set it to 0 to disable the cache
+            file (string, optional): the file where the cache is saved by save(), and loaded from (if it exists).
+                Defaults to None (the cache is only kept in memory)
+        """
+        self.maxSize = maxSize
+        self.file = file
+        self.values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if file is not None and os.path.exists(file):
+            with open(file, "rb") as f:
+                self.values = pickle.load(f)
+            self.trim()
+
+    def get(self, key):
+        """
+        Return the fitness saved with the given key, counting a hit if it is found and a miss otherwise
+
+        Args:
+            key (tuple): the key of the fitness
+
+        Returns:
+            tuple: the fitness, or None if it is not in the cache
+        """
+        fitness = self.values.get(key)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.values.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        """
+        Save a fitness in the cache
+
+        Args:
+            key (tuple): the key of the fitness
+            fitness (tuple): the fitness
+        """
+        if self.maxSize > 0:
+            self.values[key] = fitness
+            self.values.move_to_end(key)
+            self.trim()
+
+    def trim(self):
+        """
+        Remove the least recently used values until the cache is not larger than its maximum size
+        """
+        while len(self.values) > self.maxSize:
+            self.values.popitem(last=False)
+
+    def resetCounts(self):
+        """
+        Set the counts of hits and misses to zero
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def save(self):
+        """
+        Save the cache in its file, if it has one
+        """
+        if self.file is None:
+            return
+        os.makedirs(os.path.dirname(self.file), exist_ok=True)
+        # write the cache in a temporary file and then rename it, so that concurrent runs never read a partial cache
+        temporaryFile = "{}.{}.tmp".format(self.file, os.getpid())
+        with open(temporaryFile, "wb") as f:
+            pickle.dump(self.values, f)
+        os.replace(temporaryFile, self.file)
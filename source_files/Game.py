@@ -1,39 +1,61 @@
-import matplotlib.pyplot as plt
+import numpy as np
 import time
 
-import Constants as C
-from Env import Env
+from TerminalRenderer import TerminalRenderer
+from ActionTable import ActionTable, outputToAction
 
 class Game():
-    def __init__(self, env, agent, training=False):
+    # fixed set of attributes: no per-instance dictionary, smaller objects and faster attribute access
+    __slots__ = ("env", "agent", "training", "config", "score", "maxscore", "gameOver", "globalReward", "carspeed", "enemyspeed", "counter",
+                 "fastForward", "idleSteps", "useGA", "continuousEnv", "speed", "counterStep", "maxScoreToReach", "envCenter",
+                 "thresholdOutput", "printSteps", "renderer", "frameTime")
+    
+    def __init__(self, env, agent, training=False, fastForward=False, config=None):
         """
-        Initialize the game with a given environment and agent to play the steps. If training=True, no plots/prints will be rendered
+        Initialize the game with a given environment and agent to play the steps. If training=True, no prints will be rendered
 
         Args:
             env (Env): the environment where to play the game
             agent (AgentRL or DEAP compiled tree): the agent which will play the game
             training (bool, optional): Decide if the game is created to train the agent or to play. Defaults to False (play the game)
+            fastForward (bool, optional): Decide if play() can skip in a single operation the steps where the agent stands still 
+                and the enemy car simply moves down. Only valid for agents whose action is a deterministic function of the state
+                (e.g. a compiled tree), since the agent is not called again on states already seen. Defaults to False
+            config (Config, optional): the configuration of the game. Defaults to None (the one of the environment)
         """
         self.env = env
         self.agent = agent
         self.training = training
+        # game configuration, frozen at construction so that each step only reads attributes of the instance
+        self.config = config if config is not None else env.config
+        self.useGA = self.config.USEGA
+        self.continuousEnv = self.config.CONTINUOUSENV
+        self.speed = self.config.SPEED
+        self.counterStep = self.config.COUNTER
+        self.maxScoreToReach = self.config.MAXSCORE
+        self.envCenter = self.config.ENVSIZE[1]/2
+        # the output of a compiled tree has to be converted into an action, unless it has been tabulated
+        self.thresholdOutput = self.useGA and not isinstance(agent, ActionTable)
+        self.printSteps = self.config.PRINTSTEPS and (not training)
+        self.renderer = TerminalRenderer(env) if self.printSteps else None
+        # time in seconds between two printed steps (0 if the steps are not printed, or not paced with FPS<=0)
+        self.frameTime = 1/self.config.FPS if self.printSteps and self.config.FPS > 0 else 0
         self.score = 0
         self.maxscore = 0
         self.gameOver = False
         self.globalReward = 0
-        self.carspeed = C.SPEED
-        self.enemyspeed = C.SPEED
-        self.counter = C.COUNTER
+        self.carspeed = self.speed
+        self.enemyspeed = self.speed
+        self.counter = self.counterStep
+        # fast forward is not used if each step has to be printed, or if the environment has its own enemy dynamics
+        self.fastForward = fastForward and env.supportsFastForward and not self.printSteps
+        self.idleSteps = {}     # number of idle steps that can be skipped, for each position of the cars and enemy speed
         
     def play(self):
         """
-        Play the game
+        Play the game until it is over (see rollout)
         """
-        while not self.gameOver:
-            self.playStep(None)
-            # wait for 1 second before the next step to slow down the animation
-            if C.PRINTSTEPS and (not self.training):
-                time.sleep(1)
+        self.rollout()
             
         
     def playStep(self, frame):
@@ -41,26 +63,128 @@ class Game():
         Play a step of the game: extract the state, compute and apply a corresponding action, and update the agent
         
         Args:
-            frame (pyplot frame): the frame to be updated in the animation (if PLOTSTEPS=True)
+            frame (int): the index of the frame in the animation (if PLOTSTEPS=True, see PlotRenderer), unused
+            
+        Returns:
+            array, int, float: the state seen by the agent, the action taken and the reward obtained
         """   
-        if C.PRINTSTEPS and (not self.training):
-            print(self.env)
-            print("Current score:", self.score)     
+        if self.printSteps:
+            self.renderer.draw(self.score)
         state = self.env.getState()
         action = self.getAction(state) 
         reward = self.applyAction(action)
         # update the reward for GA training 
         self.globalReward += reward
-        if C.PLOTSTEPS and (not self.training):
-            plt.clf()  # Clear the current plot
-            plt.imshow(self.env.street, cmap='gray', extent=[0, self.env.envWidth, 0, self.env.envHeight])  # Update the plot with the new env data
-            plt.title(f"Current score: {self.score}, Max Score: {self.maxscore}")
-        if not C.USEGA and self.training:
-            # update states and actions for RL training
+        if not self.useGA and self.training:
+            # update states and actions for RL training (the new state has already been computed by getReward,
+            # unless the environment has been reset after a crash)
             newState = self.env.getState()
             newAction = self.getAction(newState)
             self.agent.updateQtable(state, action, reward, newState, newAction, self.gameOver)
         self.updateCounter()
+        return state, action, reward
+    
+    def rollout(self, maxSteps=None, out=None):
+        """
+        Play the game until it is over, or for at most maxSteps steps. This is the loop used by play(), hence by the 
+        evaluation of the GA individuals and by the training of the RL agent, which is trained along the way if the game 
+        has been created for RL training. If out is given, the whole trajectory is written in place into its arrays: 
+        in this case fast forward is not used, so that every step is recorded.
+        
+        Args:
+            maxSteps (int, optional): the maximum number of steps to play. Defaults to None (play until game over)
+            out (tuple of np arrays, optional): the arrays where to write the states seen by the agent (one row for each 
+                step), the actions taken, the rewards obtained and the game over flags (the last one is False if the game 
+                has been stopped after maxSteps steps), with at least maxSteps rows. Defaults to None (nothing is recorded)
+        
+        Returns:
+            int: the number of steps played (not counting the ones skipped by fast forward)
+        """
+        fastForward = self.fastForward and out is None
+        if out is not None:
+            states, actions, rewards, dones = out
+        nextFrame = time.perf_counter()
+        nSteps = 0
+        while not self.gameOver and (maxSteps is None or nSteps < maxSteps):
+            if fastForward:
+                self.skipIdleSteps()
+            state, action, reward = self.playStep(None)
+            if out is not None:
+                states[nSteps], actions[nSteps], rewards[nSteps] = state, action, reward
+                dones[nSteps] = self.gameOver
+            nSteps += 1
+            # wait until the time of the next frame to slow down the animation
+            if self.frameTime:
+                nextFrame += self.frameTime
+                time.sleep(max(0, nextFrame - time.perf_counter()))
+        return nSteps
+        
+    def snapshot(self):
+        """
+        Save the current state of the game: scores, speeds, counter and the state of the environment
+        
+        Returns:
+            tuple: the snapshot, to be passed to restore()
+        """
+        return (self.env.snapshot(), self.score, self.maxscore, self.gameOver, self.globalReward, 
+                self.carspeed, self.enemyspeed, self.counter)
+    
+    def restore(self, snapshot):
+        """
+        Restore a state of the game saved with snapshot()
+        
+        Args:
+            snapshot (tuple): the snapshot to restore
+        """
+        (envSnapshot, self.score, self.maxscore, self.gameOver, self.globalReward, 
+         self.carspeed, self.enemyspeed, self.counter) = snapshot
+        self.env.restore(envSnapshot)
+    
+    def clone(self):
+        """
+        Build a copy of the game in its current state, played by the same agent, which then evolves independently 
+        from this one (e.g. to evaluate what happens after a given action)
+        
+        Returns:
+            Game: the copy of the game
+        """
+        game = object.__new__(type(self))
+        for attribute in Game.__slots__:
+            setattr(game, attribute, getattr(self, attribute))
+        game.env = self.env.clone()
+        return game
+        
+    def skipIdleSteps(self):
+        """
+        Apply at once all the next steps where the agent stands still and the enemy car simply moves down, without crashing
+        and without exiting the environment (see Env.moveEnemyCar). In these steps nothing happens but the enemy car moving down 
+        by enemyspeed cells, and the reward is the same at each step, hence the result is the same as playing them one at a time.
+        """
+        env = self.env
+        key = (env.playerPosition, env.enemy_x_position, env.enemy_y_position, self.enemyspeed)
+        if key not in self.idleSteps:
+            # the enemy car can't crash against your car if it is not in front of it, and your car is not moving
+            enemyInFront = env.stateTable.enemyInFront(env.playerPosition, env.enemy_x_position)
+            lastPosition = 2*env.carHeight if enemyInFront else 1
+            # follow the enemy car until the agent moves or the enemy gets too close: each position along the way 
+            # leads to the same stop, hence the number of idle steps is saved for all of them
+            positions = []
+            enemy_y_position = env.enemy_y_position
+            while env.envHeight - (enemy_y_position + self.enemyspeed) >= lastPosition and \
+                  self.getAction(env.stateTable.state(env.playerPosition, env.enemy_x_position, enemy_y_position)) == 0:
+                positions.append(enemy_y_position)
+                enemy_y_position += self.enemyspeed
+            positions.append(enemy_y_position)
+            for i, y in enumerate(positions):
+                self.idleSteps[(env.playerPosition, env.enemy_x_position, y, self.enemyspeed)] = len(positions) - 1 - i
+        nSteps = self.idleSteps[key]
+        if nSteps == 0:
+            return
+        # the reward does not depend on the vertical position of the enemy car, hence it is the same for all the skipped steps
+        reward = self.getReward(0)
+        for _ in range(nSteps):
+            self.globalReward += reward
+        env.shiftEnemyCar(nSteps*self.enemyspeed)
         
     def getAction(self, state):
         """
@@ -75,9 +199,10 @@ class Game():
         # The following line is used to extract the action from the agent:
         # - if we are using GA, the agent is a compiled tree, and the __call__ method of the tree is used to get the action
         # - if we are using RL, the agent is an instance of AgentRL, and the __call__ method of the agent is used to get the action
+        # - if the agent is an ActionTable, the action is looked up in the table
         action = self.agent(*state)
-        if C.USEGA:
-            return 0 if abs(action)<0.001 else 3 if action>3 else 4 if action<-3 else 1 if action>0 else 2
+        if self.thresholdOutput:
+            return outputToAction(action)
         else:
             return action
 
@@ -120,13 +245,13 @@ class Game():
             # 3) if you moved, you get a slightly negative reward (to encourage the agent to move only if really needed and to stand still when waiting for the enemy)
             # 4) if you used the boost, you get a negative reward (to discourage the use of the it and only use it in case of emergency)
             rewardForEnemy = -10 if self.env.getState()[0] else +1     #old version: min(*self.env.enemyDistance())/float(C.ENVSIZE[1])
-            distFromCenter = abs(self.env.playerPosition-C.ENVSIZE[1]/2)
-            rewardForCenter = 0 if C.CONTINUOUSENV else 2/(1+distFromCenter)
+            distFromCenter = abs(self.env.playerPosition-self.envCenter)
+            rewardForCenter = 0 if self.continuousEnv else 2/(1+distFromCenter)
             rewardForMoving = 1 if (action==0) else 0
             rewardForBoost = -100  if action==3 or action==4 else 0
             reward = rewardForEnemy + rewardForCenter + rewardForMoving + rewardForBoost
             # if the score is greater than the max score, the game is over
-            if self.score >= C.MAXSCORE:
+            if self.score >= self.maxScoreToReach:
                 self.crash()
                 self.gameOver = True
         return reward
@@ -135,12 +260,13 @@ class Game():
         """
         Update the counter and increase enemy speed if needed
         """
-        if self.score == self.counter: 
+        # more enemy cars can exit in the same step (see TrafficEnv), hence the score can jump past the counter
+        while self.score >= self.counter: 
             self.enemyspeed += 1  # increase the speed 
-            self.counter += C.COUNTER # set the next score to be reached to increase the speed
+            self.counter += self.counterStep # set the next score to be reached to increase the speed
         if self.gameOver:
-            self.enemyspeed = C.SPEED # reset the speed 
-            self.counter = C.COUNTER # reset the counter
+            self.enemyspeed = self.speed # reset the speed 
+            self.counter = self.counterStep # reset the counter
     
     def crash(self):  
         """
@@ -149,7 +275,7 @@ class Game():
         # update the max score
         if self.score > self.maxscore: 
             self.maxscore = self.score
-        # reset the environment
-        self.env = Env(*C.ENVSIZE, *C.CARSIZE)
+        # reset the environment in place, reusing it for the next game
+        self.env.reset()
         self.score = 0
     
\ No newline at end of file
@@ -0,0 +1,62 @@
+import numpy as np
+
+from Config import Config
+from VecEnv import VecEnv
+
+class GymVecEnv:
+    def __init__(self, nGames, seed=None, config=None):
+        """
+        Vectorized environment with a Gym-like interface: reset() starts nGames independent games and step(actions)
+        advances all of them at once, returning batches of observations, rewards and game over flags. Games follow the
+        dynamics of Env, the rewards are shaped as in Game.getReward, and the environment and car sizes are the ones
+        set in the configuration. Games that are over are automatically restarted, as in Game.crash.
+
+        Observations, rewards and game over flags are written in the same preallocated arrays at each call, to avoid
+        allocating new objects at each step: copy them if you need to keep them after the next call.
+
+        Args:
+            nGames (int): the number of games to play in parallel
+            seed (int or np.random.SeedSequence, optional): the seed of the random generator of the games. Defaults to None (spawn a new stream from the root one)
+            config (Config, optional): the configuration of the games. Defaults to None (the one set in the Constants file)
+        """
+        self.nGames = nGames
+        self.nActions = 5               # number of possible actions
+        self.observationSize = 5        # number of elements of a state
+        config = config if config is not None else Config()
+        self.vecEnv = VecEnv(nGames, *config.ENVSIZE, *config.CARSIZE, seed=seed, config=config)
+        # preallocated output arrays
+        self.observations = np.empty((nGames, self.observationSize), dtype=int)
+        self.rewards = np.empty(nGames, dtype=float)
+        self.dones = np.empty(nGames, dtype=bool)
+        self.infos = {"score": self.vecEnv.score, "maxscore": self.vecEnv.maxscore}
+
+    def reset(self, seed=None):
+        """
+        Start new games in all the environments
+
+        Args:
+            seed (int or np.random.SeedSequence, optional): the seed used to build a new random generator for the games. Defaults to None (keep the current one)
+
+        Returns:
+            np array: the (nGames, 5) matrix of the initial observations
+        """
+        self.vecEnv.reset(seed)
+        return self.vecEnv.getState(out=self.observations)
+
+    def step(self, actions):
+        """
+        Apply an action in each game
+
+        Args:
+            actions (int array): the action to apply in each game
+
+        Returns:
+            np array, np array, np array, dict: the (nGames, 5) matrix of the observations after the step (the initial observations
+            of the new games for the games that are over), the rewards, the game over flags and a dictionary with the current
+            score and max score of each game
+        """
+        rewards, dones = self.vecEnv.step(actions)
+        self.rewards[:] = rewards
+        self.dones[:] = dones
+        self.vecEnv.getState(out=self.observations)
+        return self.observations, self.rewards, self.dones, self.infos
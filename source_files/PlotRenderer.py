@@ -0,0 +1,46 @@
+import matplotlib.pyplot as plt
+from matplotlib.animation import FuncAnimation
+
+class PlotRenderer:
+    def __init__(self, game, frameSkip=1):
+        """
+        Initialize the animated plot of a game. The figure, the image of the environment and the score text are
+        created once, then each frame only updates their data and redraws them over a cached background (blitting)
+
+        Args:
+            game (Game): the game to be played and plotted
+            frameSkip (int, optional): the number of steps played between two frames. Defaults to 1 (plot every step)
+        """
+        self.game = game
+        self.frameSkip = frameSkip
+        env = game.env
+        self.figure, self.axes = plt.subplots(figsize=game.config.ENVSIZE)
+        # the street only contains 0 (empty) and 1 (car), hence the color scale is fixed once for all
+        self.image = self.axes.imshow(env.street, cmap='gray', vmin=0, vmax=1, extent=[0, env.envWidth, 0, env.envHeight], animated=True)
+        # the score is drawn inside the axes, since only the area of the axes is redrawn at each frame
+        self.text = self.axes.text(0.5, 0.99, "", transform=self.axes.transAxes, ha="center", va="top",
+                                   color="red", animated=True)
+        self.animation = None
+
+    def updateFrame(self, frame):
+        """
+        Play the next steps of the game and update the plotted data
+
+        Args:
+            frame (int): the index of the frame in the animation
+
+        Returns:
+            tuple: the artists that have been updated
+        """
+        for _ in range(self.frameSkip):
+            self.game.playStep(frame)
+        self.image.set_data(self.game.env.street)
+        self.text.set_text(f"Current score: {self.game.score}, Max Score: {self.game.maxscore}")
+        return self.image, self.text
+
+    def show(self):
+        """
+        Start the animation (it won't stop until the user closes the plot)
+        """
+        self.animation = FuncAnimation(self.figure, self.updateFrame, frames=10000000, interval=self.game.config.WAIT, blit=True, cache_frame_data=False)
+        plt.show()
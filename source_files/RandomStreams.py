@@ -0,0 +1,52 @@
+import numpy as np
+
+import Constants as C
+
+# Roots of all the random streams of the process, one for each root seed: each environment and agent spawns 
+# its own independent stream from the root of its configuration
+rootSeedSequences = {}
+
+def makeSeedSequence(seed=None, rootSeed=None):
+    """
+    Build the seed sequence of a new independent random stream
+
+    Args:
+        seed (int or np.random.SeedSequence, optional): the seed of the stream. Defaults to None (spawn a new stream from the root one)
+        rootSeed (int, optional): the seed of the root stream, used if seed is None. Defaults to None (the SEED set in the Constants file)
+
+    Returns:
+        np.random.SeedSequence: the seed sequence
+    """
+    if seed is None:
+        rootSeed = C.SEED if rootSeed is None else rootSeed
+        if rootSeed not in rootSeedSequences:
+            rootSeedSequences[rootSeed] = np.random.SeedSequence(rootSeed)
+        return rootSeedSequences[rootSeed].spawn(1)[0]
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+def makeGenerator(seed=None, rootSeed=None):
+    """
+    Build a random generator with its own independent stream
+
+    Args:
+        seed (int or np.random.SeedSequence, optional): the seed of the generator. Defaults to None (spawn a new stream from the root one)
+        rootSeed (int, optional): the seed of the root stream, used if seed is None. Defaults to None (the SEED set in the Constants file)
+
+    Returns:
+        np.random.Generator: the random generator
+    """
+    return np.random.default_rng(makeSeedSequence(seed, rootSeed))
+
+def copyGenerator(rng):
+    """
+    Build an independent copy of a random generator, which will draw the same numbers as the original one
+
+    Args:
+        rng (np.random.Generator): the generator to copy
+
+    Returns:
+        np.random.Generator: the copy of the generator
+    """
+    bitGenerator = type(rng.bit_generator)(0)
+    bitGenerator.state = rng.bit_generator.state
+    return np.random.Generator(bitGenerator)
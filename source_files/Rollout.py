@@ -0,0 +1,27 @@
+import numpy as np
+
+def rolloutGames(games, maxSteps):
+    """
+    Play each of the given games until it is over, or for at most maxSteps steps, and collect all the trajectories
+    (see Game.rollout) in arrays with one row for each game. The games can be played by any agent (a compiled tree
+    or an AgentRL), hence the same arrays can be used to analyse both of them or to train an agent off-line.
+
+    Args:
+        games (list of Game): the games to play
+        maxSteps (int): the maximum number of steps to play in each game
+
+    Returns:
+        np array, np array, np array, np array, np array: the states (nGames, maxSteps, 5), the actions (nGames, maxSteps),
+        the rewards (nGames, maxSteps) and the game over flags (nGames, maxSteps) of all the games, and the number of
+        steps played in each game. Entries after the last step of a game are left to zero
+    """
+    nGames = len(games)
+    states = np.zeros((nGames, maxSteps, 5), dtype=int)
+    actions = np.zeros((nGames, maxSteps), dtype=int)
+    rewards = np.zeros((nGames, maxSteps), dtype=float)
+    dones = np.zeros((nGames, maxSteps), dtype=bool)
+    lengths = np.zeros(nGames, dtype=int)
+    for i, game in enumerate(games):
+        # each game writes its trajectory directly into its row of the arrays
+        lengths[i] = game.rollout(maxSteps, out=(states[i], actions[i], rewards[i], dones[i]))
+    return states, actions, rewards, dones, lengths
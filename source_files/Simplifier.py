@@ -0,0 +1,225 @@
+from deap import gp
+
+# Largest integer which is represented exactly both as an integer and as a float
+MAXEXACTINTEGER = 2**53
+
+def simplifyTree(tree, pset):
+    """
+    Rewrite a tree of the primitive set of AgentEA (see AgentEA.makePrimitiveSet) into a smaller tree with exactly the same
+    behaviour in the game, by applying the following rules from the leaves to the root:
+    - primitives whose arguments are all constants are replaced by their value
+    - if_then_else(c, a, a) -> a, if_then_else(True, a, b) -> a, if_then_else(not_(c), a, b) -> if_then_else(c, b, a)
+    - not_(not_(x)) -> x, and_(x, x) -> x, or_(x, x) -> x, and/or with a constant argument
+    - add(x, 0) -> x, sub(x, 0) -> x, mul(x, 1) -> x
+    - sub(x, x) -> 0, mul(x, 0) -> 0, eq(x, x) -> True, lt(x, x) -> False, if x is an integer
+    Boolean values are always 0 or 1, and the elements of the state are always integers, hence a subtree made only of
+    integer inputs, integer constants, add, sub, mul and if_then_else is an integer (which is never infinite or NaN).
+
+    Args:
+        tree (PrimitiveTree): the tree to simplify
+        pset (PrimitiveSetTyped): the primitive set of the tree
+
+    Returns:
+        PrimitiveTree: the simplified tree
+    """
+    nodes, _ = simplifySubtree(tree, 0, pset)
+    return gp.PrimitiveTree(nodes)
+
+def simplifySubtree(tree, index, pset):
+    """
+    Simplify the subtree starting at the given index of a tree
+
+    Args:
+        tree (PrimitiveTree): the tree
+        index (int): the index of the root of the subtree
+        pset (PrimitiveSetTyped): the primitive set of the tree
+
+    Returns:
+        list, int: the nodes of the simplified subtree and the index of the first node after the subtree
+    """
+    node = tree[index]
+    index += 1
+    if not isinstance(node, gp.Primitive):
+        return [node], index
+    children = []
+    for _ in range(node.arity):
+        child, index = simplifySubtree(tree, index, pset)
+        children.append(child)
+    return simplifyPrimitive(node, children, pset), index
+
+def simplifyPrimitive(primitive, children, pset):
+    """
+    Simplify a primitive whose arguments have already been simplified
+
+    Args:
+        primitive (Primitive): the primitive
+        children (list of lists): the nodes of each argument
+        pset (PrimitiveSetTyped): the primitive set of the tree
+
+    Returns:
+        list: the nodes of the simplified subtree
+    """
+    name = primitive.name
+    ret = primitive.ret
+    values = [constantValue(child, pset) for child in children]
+    # replace primitives with constant arguments by their value
+    if all(value is not None for value in values):
+        value = pset.context[name](*values)
+        if isExactConstant(value):
+            return [makeConstant(value, ret)]
+    first, second = children[0], children[-1]
+    sameArguments = len(children) == 2 and sameSubtree(first, second)
+    match name:
+        case "not_":
+            if first[0].name == "not_":
+                return first[1:]
+        case "and_" | "or_":
+            if sameArguments:
+                return first
+            for child, other in ((first, second), (second, first)):
+                value = constantValue(child, pset)
+                if value is not None:
+                    # x&1 = x|0 = x, while x&0 = 0 and x|1 = 1
+                    return other if bool(value) == (name == "and_") else [makeConstant(bool(value), ret)]
+        case "if_then_else":
+            condition, ifTrue, ifFalse = children
+            if sameSubtree(ifTrue, ifFalse):
+                return ifTrue
+            if values[0] is not None:
+                return ifTrue if values[0] else ifFalse
+            if condition[0].name == "not_":
+                return [primitive] + condition[1:] + ifFalse + ifTrue
+        case "add":
+            for child, other in ((first, second), (second, first)):
+                if isIntegerConstant(child, pset, 0):
+                    return other
+        case "sub":
+            if isIntegerConstant(second, pset, 0):
+                return first
+            if sameArguments and isInteger(first, pset):
+                return [makeConstant(0, ret)]
+        case "mul":
+            for child, other in ((first, second), (second, first)):
+                if isIntegerConstant(child, pset, 1):
+                    return other
+                if isIntegerConstant(child, pset, 0) and isInteger(other, pset):
+                    return [makeConstant(0, ret)]
+        case "eq" | "lt":
+            if sameArguments and isInteger(first, pset):
+                return [makeConstant(name == "eq", ret)]
+    return [primitive] + [node for child in children for node in child]
+
+def constantValue(nodes, pset):
+    """
+    Return the value of a subtree if it is a constant
+
+    Args:
+        nodes (list): the nodes of the subtree
+        pset (PrimitiveSetTyped): the primitive set of the tree
+
+    Returns:
+        the value of the constant, or None if the subtree is not a constant
+    """
+    node = nodes[0]
+    if isinstance(node, gp.Terminal) and node.name not in pset.arguments:
+        return node.value
+    return None
+
+def isIntegerConstant(nodes, pset, value):
+    """
+    Check if a subtree is an integer constant with the given value
+
+    Args:
+        nodes (list): the nodes of the subtree
+        pset (PrimitiveSetTyped): the primitive set of the tree
+        value (int): the value
+
+    Returns:
+        bool: True if the subtree is the integer constant
+    """
+    constant = constantValue(nodes, pset)
+    return type(constant) is int and constant == value
+
+def isInteger(nodes, pset):
+    """
+    Check if the value of a subtree is always an integer (see simplifyTree)
+
+    Args:
+        nodes (list): the nodes of the subtree
+        pset (PrimitiveSetTyped): the primitive set of the tree
+
+    Returns:
+        bool: True if the value of the subtree is always an integer
+    """
+    node = nodes[0]
+    if not isinstance(node, gp.Primitive):
+        return node.name in pset.arguments or type(node.value) is int
+    # walk the arguments of the root, skipping the condition of if_then_else
+    index = 1
+    for argument in range(node.arity):
+        end = subtreeEnd(nodes, index)
+        if not (node.name == "if_then_else" and argument == 0) and \
+           (node.name not in ("add", "sub", "mul", "if_then_else") or not isInteger(nodes[index:end], pset)):
+            return False
+        index = end
+    return True
+
+def subtreeEnd(nodes, index):
+    """
+    Return the index of the first node after the subtree starting at the given index
+
+    Args:
+        nodes (list): the nodes of a tree
+        index (int): the index of the root of the subtree
+
+    Returns:
+        int: the index after the subtree
+    """
+    remaining = 1
+    while remaining > 0:
+        remaining += nodes[index].arity - 1
+        index += 1
+    return index
+
+def sameSubtree(first, second):
+    """
+    Check if two subtrees are equal
+
+    Args:
+        first (list): the nodes of the first subtree
+        second (list): the nodes of the second subtree
+
+    Returns:
+        bool: True if they have the same nodes
+    """
+    return len(first) == len(second) and all(a.name == b.name for a, b in zip(first, second))
+
+def isExactConstant(value):
+    """
+    Check if the value of a primitive can be used as a constant without changing the behaviour of the tree: booleans,
+    finite floats and integers which are represented exactly both as integers and as floats
+
+    Args:
+        value: the value
+
+    Returns:
+        bool: True if the value can be used as a constant
+    """
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, int):
+        return abs(value) < MAXEXACTINTEGER
+    return isinstance(value, float) and abs(value) < float("inf")
+
+def makeConstant(value, ret):
+    """
+    Build a constant terminal
+
+    Args:
+        value: the value of the constant (bool, int or float)
+        ret (type): the type of the terminal in the tree
+
+    Returns:
+        Terminal: the terminal
+    """
+    return gp.Terminal(value, False, ret)
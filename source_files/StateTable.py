@@ -0,0 +1,265 @@
+import numpy as np
+import os
+
+# State tables already loaded in this process, one for each game configuration
+stateTables = {}
+
+class StateTable:
+    def __init__(self, height, width, carHeight, carWidth, config, horizontal=None, vertical=None):
+        """
+        Initialize the state lookup table for the given environment and game configuration.
+        The state of the environment only depends on the position of your car and on the position of the enemy car, hence
+        it can be computed once for all the possible positions and then extracted with array indexes. Moreover, all the
+        elements of the state but enemyVerticalDistance only depend on the horizontal positions of the cars, while
+        enemyVerticalDistance only depends on the vertical position of the enemy car (and on enemyInFront, when binned),
+        hence the table is split in two parts:
+
+            horizontal[playerPosition, enemy_x_position]  the state, with enemyVerticalDistance set to 0
+            vertical[enemyInFront, enemy_y_position]      the enemyVerticalDistance
+
+        which take O(width^2 + height) memory instead of O(width^2 * height). Both parts are stored with the smallest
+        integer type which holds their values. If the horizontal part would be larger than STATETABLEMAXSIZE bytes,
+        it is not built and its values are computed when needed (see computeHorizontal).
+
+        Args:
+            height (int): the environment height
+            width (int): the environment width
+            carHeight (int): the cars height
+            carWidth (int): the cars width
+            config (Config): the configuration of the game
+            horizontal (np array, optional): the (width, width, 5) horizontal part, e.g. loaded from a file. Defaults to None (build it)
+            vertical (np array, optional): the (2, height) vertical part, e.g. loaded from a file. Defaults to None (build it)
+        """
+        self.geometry = (height, width, carHeight, carWidth, config)
+        if vertical is None:
+            enemyInFront, enemy_y_position = np.meshgrid(np.arange(2), np.arange(height), indexing="ij")
+            vertical = compactArray(computeVertical(enemyInFront.ravel(), enemy_y_position.ravel(), *self.geometry).reshape(2, height))
+        if horizontal is None and width*width*5 <= config.STATETABLEMAXSIZE:
+            playerPosition, enemy_x_position = np.meshgrid(np.arange(width), np.arange(width), indexing="ij")
+            horizontal = compactArray(computeHorizontal(playerPosition.ravel(), enemy_x_position.ravel(), *self.geometry).reshape(width, width, 5))
+        self.horizontal = horizontal
+        self.vertical = vertical
+        for table in (self.horizontal, self.vertical):
+            if table is not None:
+                table.flags.writeable = False
+
+    def state(self, playerPosition, enemy_x_position, enemy_y_position):
+        """
+        Return the state for the given positions of the cars
+
+        Args:
+            playerPosition (int): the position of your car
+            enemy_x_position (int): the horizontal position of the enemy car
+            enemy_y_position (int): the vertical position of the enemy car
+
+        Returns:
+            np array: the quintuple (enemyInFront, enemyVerticalDistance, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance)
+        """
+        if self.horizontal is not None:
+            state = self.horizontal[playerPosition, enemy_x_position].astype(int)
+        else:
+            state = computeHorizontal(np.array([playerPosition]), np.array([enemy_x_position]), *self.geometry)[0]
+        state[1] = self.vertical[state[0], enemy_y_position]
+        return state
+
+    def states(self, playerPosition, enemy_x_position, enemy_y_position, out=None):
+        """
+        Return the states for arrays of positions of the cars
+
+        Args:
+            playerPosition (int array): the positions of your car
+            enemy_x_position (int array): the horizontal positions of the enemy car
+            enemy_y_position (int array): the vertical positions of the enemy car
+            out (np array, optional): a (n, 5) int matrix where to write the states. Defaults to None (allocate a new matrix)
+
+        Returns:
+            np array: a (n, 5) matrix with the state for each triple of positions
+        """
+        if out is None:
+            out = np.empty((len(playerPosition), 5), dtype=int)
+        if self.horizontal is not None:
+            out[:] = self.horizontal[playerPosition, enemy_x_position]
+        else:
+            out[:] = computeHorizontal(playerPosition, enemy_x_position, *self.geometry)
+        out[:, 1] = self.vertical[out[:, 0], enemy_y_position]
+        return out
+
+    def enemyInFront(self, playerPosition, enemy_x_position):
+        """
+        Check if the enemy car is in front of your car
+
+        Args:
+            playerPosition (int): the position of your car
+            enemy_x_position (int): the horizontal position of the enemy car
+
+        Returns:
+            bool: True if the enemy car is in front of your car
+        """
+        return bool(self.state(playerPosition, enemy_x_position, 0)[0])
+
+    def allStates(self, maxPlayerPosition, maxEnemyPosition):
+        """
+        Return all the different states for the positions of your car below maxPlayerPosition, the horizontal positions
+        of the enemy car below maxEnemyPosition, and all the vertical positions of the enemy car
+
+        Args:
+            maxPlayerPosition (int): the number of positions of your car
+            maxEnemyPosition (int): the number of horizontal positions of the enemy car
+
+        Returns:
+            np array: the sorted states, one for each row
+        """
+        enemy_x_position = np.arange(maxEnemyPosition)
+        # the different horizontal parts, computed one position of your car at a time if the table has not been built
+        rows = np.unique(np.concatenate([self.states(np.full(maxEnemyPosition, playerPosition), enemy_x_position, np.zeros(maxEnemyPosition, dtype=int))
+                                         for playerPosition in range(maxPlayerPosition)]), axis=0)
+        states = []
+        for enemyInFront in (0, 1):
+            # combine each horizontal part with each vertical distance it can be found with
+            distances = np.unique(self.vertical[enemyInFront])
+            horizontalRows = rows[rows[:, 0] == enemyInFront]
+            combined = np.repeat(horizontalRows, len(distances), axis=0)
+            combined[:, 1] = np.tile(distances, len(horizontalRows))
+            states.append(combined)
+        return np.unique(np.concatenate(states), axis=0)
+
+def getStateTable(height, width, carHeight, carWidth, config):
+    """
+    Return the state lookup table for the given environment and game configuration (see StateTable).
+    The table is built the first time it is requested and cached on disk, in the folder set in the configuration,
+    so that it can be loaded by later runs with the same configuration.
+
+    Args:
+        height (int): the environment height
+        width (int): the environment width
+        carHeight (int): the cars height
+        carWidth (int): the cars width
+        config (Config): the configuration of the game
+
+    Returns:
+        StateTable: the state lookup table
+    """
+    key = (height, width, carHeight, carWidth, config.SPEED, config.BOOST, config.CONTINUOUSENV, config.USEGA)
+    if key in stateTables:
+        return stateTables[key]
+    file = config.STATETABLEPATH + "env{}x{}_car{}x{}_speed{}_boost{}_cont{:d}_ga{:d}.npz".format(*key)
+    if os.path.exists(file) and width*width*5 <= config.STATETABLEMAXSIZE:
+        with np.load(file) as arrays:
+            stateTable = StateTable(height, width, carHeight, carWidth, config, arrays["horizontal"], arrays["vertical"])
+    else:
+        stateTable = StateTable(height, width, carHeight, carWidth, config)
+        # tables too large to be built are not saved either
+        if stateTable.horizontal is not None:
+            os.makedirs(config.STATETABLEPATH, exist_ok=True)
+            # write the table in a temporary file and then rename it, so that concurrent runs never read a partial table
+            temporaryFile = "{}.{}.tmp".format(file, os.getpid())
+            with open(temporaryFile, "wb") as f:
+                np.savez(f, horizontal=stateTable.horizontal, vertical=stateTable.vertical)
+            os.replace(temporaryFile, file)
+    stateTables[key] = stateTable
+    return stateTable
+
+def compactArray(array):
+    """
+    Convert an integer array to the smallest integer type which holds all its values
+
+    Args:
+        array (int array): the array
+
+    Returns:
+        np array: the converted array
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if array.size == 0 or (array.min() >= info.min and array.max() <= info.max):
+            return array.astype(dtype)
+    return array
+
+def computeStates(playerPosition, enemy_x_position, enemy_y_position, height, width, carHeight, carWidth, config):
+    """
+    Compute the states for arrays of positions of your car and of the enemy car, following the same rules of
+    Env.frontObstacles and Env.sideObstacles
+
+    Args:
+        playerPosition (int array): the positions of your car
+        enemy_x_position (int array): the horizontal positions of the enemy car
+        enemy_y_position (int array): the vertical positions of the enemy car
+        height (int): the environment height
+        width (int): the environment width
+        carHeight (int): the cars height
+        carWidth (int): the cars width
+        config (Config): the configuration of the game
+
+    Returns:
+        np array: a (n, 5) matrix whose rows are the quintuples
+        (enemyInFront, enemyVerticalDistance, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance)
+    """
+    states = computeHorizontal(playerPosition, enemy_x_position, height, width, carHeight, carWidth, config)
+    states[:, 1] = computeVertical(states[:, 0], enemy_y_position, height, width, carHeight, carWidth, config)
+    return states
+
+def computeHorizontal(playerPosition, enemy_x_position, height, width, carHeight, carWidth, config):
+    """
+    Compute the elements of the states which only depend on the horizontal positions of the cars
+
+    Args:
+        playerPosition (int array): the positions of your car
+        enemy_x_position (int array): the horizontal positions of the enemy car
+        height (int): the environment height
+        width (int): the environment width
+        carHeight (int): the cars height
+        carWidth (int): the cars width
+        config (Config): the configuration of the game
+
+    Returns:
+        np array: a (n, 5) matrix whose rows are the quintuples
+        (enemyInFront, 0, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance)
+    """
+    # horizontal distances between the cars (see Env.enemyDistance)...
+    if config.CONTINUOUSENV:
+        leftEnemyDistance  = (playerPosition - enemy_x_position)%width - carWidth
+        rightEnemyDistance = (enemy_x_position - playerPosition)%width - carWidth
+    else:
+        isEnemyLeft = enemy_x_position < playerPosition
+        leftEnemyDistance  = np.where(isEnemyLeft, (playerPosition - enemy_x_position) - carWidth, width)
+        rightEnemyDistance = np.where(isEnemyLeft, width, (enemy_x_position - playerPosition) - carWidth)
+    # ... and from the walls (see Env.wallDistance)
+    leftWallDistance  = np.full_like(playerPosition, width) if config.CONTINUOUSENV else playerPosition
+    rightWallDistance = np.full_like(playerPosition, width) if config.CONTINUOUSENV else width - (playerPosition + carWidth)
+    enemyInFront = np.minimum(leftEnemyDistance, rightEnemyDistance) < 0
+    enemyLeftOrRight = enemy_x_position < playerPosition
+    obstacleLeftDistance  = np.minimum(leftWallDistance, leftEnemyDistance)
+    obstacleRightDistance = np.minimum(rightWallDistance, rightEnemyDistance)
+    if not config.USEGA:
+        # Bin the distances if using RL, to avoid a too large state space (see Env.sideObstacles and Env.bin)
+        binThresholds = np.array((config.SPEED, 2*config.SPEED, 2*config.BOOST*config.SPEED))
+        obstacleLeftDistance  = np.searchsorted(binThresholds, obstacleLeftDistance, side="right")
+        obstacleRightDistance = np.searchsorted(binThresholds, obstacleRightDistance, side="right")
+    return np.stack((enemyInFront, np.zeros_like(enemyInFront), enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance), axis=1).astype(int)
+
+def computeVertical(enemyInFront, enemy_y_position, height, width, carHeight, carWidth, config):
+    """
+    Compute the enemyVerticalDistance element of the states
+
+    Args:
+        enemyInFront (int array): if the enemy car is in front of your car
+        enemy_y_position (int array): the vertical positions of the enemy car
+        height (int): the environment height
+        width (int): the environment width
+        carHeight (int): the cars height
+        carWidth (int): the cars width
+        config (Config): the configuration of the game
+
+    Returns:
+        np array: the vertical distances
+    """
+    enemyVerticalDistance = height - enemy_y_position - 2*carHeight
+    if not config.USEGA:
+        # Bin the distance if using RL (see Env.frontObstacles and Env.bin): thresholds are checked in order,
+        # hence a distance is binned with the first threshold it is below
+        b = 0 if carWidth%(config.BOOST*config.SPEED)==0 else 1
+        c = 0 if carWidth%config.SPEED==0 else 1
+        thresholds = np.array((config.SPEED, 2*config.SPEED, carWidth//(config.BOOST*config.SPEED)+b, carWidth//config.SPEED+c))
+        belowThreshold = enemyVerticalDistance[:, None] < thresholds[None, :]
+        enemyVerticalDistance = np.where((enemyInFront != 0) & belowThreshold.any(axis=1), belowThreshold.argmax(axis=1), 4)
+    return enemyVerticalDistance.astype(int)
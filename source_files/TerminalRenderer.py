@@ -0,0 +1,65 @@
+import sys
+import numpy as np
+
+# ANSI escape sequences: clear the screen, move the cursor to a given row and column (1-based) and clear the rest of a line
+CLEARSCREEN = "\x1b[2J"
+MOVECURSOR = "\x1b[{};{}H"
+CLEARLINE = "\x1b[K"
+# copy paste symbols: https://www.w3.org/TR/xml-entity-names/025.html
+CARSYMBOL = "█"
+
+def buildFrame(street):
+    """
+    Build the grid of the environment as a string, with a box for each cell
+
+    Args:
+        street (np array): the street matrix, with 1 where there is a car and 0 elsewhere
+
+    Returns:
+        str: the grid, one line for each row of cells and one for each horizontal border
+    """
+    height, width = street.shape
+    top    = "┏" + "┳".join(["━━━"]*width) + "┓"
+    middle = "┣" + "╋".join(["━━━"]*width) + "┫"
+    bottom = "┗" + "┻".join(["━━━"]*width) + "┛"
+    rows = ["┃" + "┃".join([" █ " if cell == 1 else "   " for cell in row]) + "┃" for row in street]
+    return "\n".join([top, ("\n" + middle + "\n").join(rows), bottom]) + "\n"
+
+class TerminalRenderer:
+    def __init__(self, env, stream=None):
+        """
+        Initialize a renderer which draws the environment in a terminal. The whole grid is drawn only once, then
+        at each step the cursor is moved to the cells which changed since the previous step and only them are redrawn
+
+        Args:
+            env (Env): the environment to draw
+            stream (file, optional): where to write the frames. Defaults to None (standard output)
+        """
+        self.env = env
+        self.stream = stream if stream is not None else sys.stdout
+        self.previousStreet = None
+        # terminal row of each row of cells, and terminal column of the center of each column of cells
+        self.cellRows = 2*np.arange(env.envHeight) + 2
+        self.cellColumns = 4*np.arange(env.envWidth) + 3
+        self.scoreRow = 2*env.envHeight + 2
+
+    def draw(self, score):
+        """
+        Draw the current state of the environment and the current score
+
+        Args:
+            score (int): the current score
+        """
+        street = self.env.street
+        if self.previousStreet is None:
+            # first frame: clear the screen and draw the whole grid
+            output = [CLEARSCREEN, MOVECURSOR.format(1, 1), buildFrame(street)]
+        else:
+            # next frames: only redraw the cells which changed
+            rows, columns = np.nonzero(street != self.previousStreet)
+            output = [MOVECURSOR.format(self.cellRows[i], self.cellColumns[j]) + (CARSYMBOL if street[i, j] == 1 else " ")
+                      for i, j in zip(rows, columns)]
+        output.append(MOVECURSOR.format(self.scoreRow, 1) + "Current score: {}".format(score) + CLEARLINE + "\n")
+        self.stream.write("".join(output))
+        self.stream.flush()
+        self.previousStreet = street
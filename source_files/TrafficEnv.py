@@ -0,0 +1,170 @@
+import numpy as np
+
+from Env import Env, SPAWNBATCHSIZE
+
+class TrafficEnv(Env):
+    # enemy cars follow their own dynamics, hence idle steps can't be skipped by moving a single enemy car
+    supportsFastForward = False
+    __slots__ = ("nEnemies", "enemyGap", "enemyXPositions", "enemyYPositions")
+
+    def __init__(self, height, width, carHeight, carWidth, nEnemies, headless=False, seed=None, config=None):
+        """
+        Initialize an environment with nEnemies enemy cars on the road at the same time. Enemy cars enter the environment
+        one after the other, at a fixed vertical distance, and their positions are stored in arrays so that all of them
+        are moved and checked for crashes at once. The state of the environment is computed with respect to a single
+        reference enemy car (see updateReferenceEnemy), whose position is stored in enemy_x_position and enemy_y_position
+        as in Env, hence a TrafficEnv can be used by Game and by the agents in place of an Env.
+        With nEnemies=1 the game is the same as in Env.
+
+        Args:
+            height (int): the environment height
+            width (int): the environment width
+            carHeight (int): the cars height
+            carWidth (int): the cars width
+            nEnemies (int): the number of enemy cars
+            headless (bool, optional): if True, the street matrix is built only when it is requested. Defaults to False
+            seed (int or np.random.SeedSequence, optional): the seed of the random generator of the environment.
+                Defaults to None (spawn a new independent stream from the root one)
+            config (Config, optional): the configuration of the game. Defaults to None (the one set in the Constants file)
+        """
+        self.nEnemies = nEnemies
+        # vertical distance between two consecutive enemy cars: they can't overlap, and they are spread over the whole environment
+        self.enemyGap = max(carHeight, -(-height // nEnemies))
+        self.enemyXPositions = np.zeros(nEnemies, dtype=int)
+        self.enemyYPositions = np.zeros(nEnemies, dtype=int)
+        super().__init__(height, width, carHeight, carWidth, headless, seed, config)
+
+    def nextSpawnPositions(self, nPositions):
+        """
+        Return the horizontal positions of new enemy cars, taken from the batch of pre-sampled positions
+
+        Args:
+            nPositions (int): the number of positions to return
+
+        Returns:
+            int array: the positions
+        """
+        if self.spawnIndex + nPositions > len(self.spawnPositions):
+            maxValidPosition = self.envWidth if self.continuousEnv else self.envWidth - self.carWidth
+            self.spawnPositions = self.rng.integers(maxValidPosition, size=max(SPAWNBATCHSIZE, nPositions))
+            self.spawnIndex = 0
+        positions = self.spawnPositions[self.spawnIndex:self.spawnIndex + nPositions]
+        self.spawnIndex += nPositions
+        return positions
+
+    def generateEnemyCar(self):
+        """
+        Initialize all the enemy cars in random horizontal positions: the first one in the first row, and the other ones
+        queued above the environment, each one enemyGap rows above the previous one
+        """
+        self.enemyXPositions[:] = self.nextSpawnPositions(self.nEnemies)
+        self.enemyYPositions[:] = -self.enemyGap * np.arange(self.nEnemies)
+        self.updateReferenceEnemy()
+        self.renderEnemyCar(1)
+
+    def renderEnemyCar(self, placeOrRemove, street=None):
+        """
+        Render all the enemy cars inside the environment (only the part of them which is inside the environment).
+
+        Args:
+            placeOrRemove (bool): 1 to place the cars, 0 to remove them
+            street (np array, optional): the matrix where to render the cars. Defaults to None (the street matrix of the environment)
+        """
+        if street is None:
+            if self.headless:
+                return
+            street = self.streetMatrix
+        for enemy_y_position, enemy_x_position in zip(self.enemyYPositions.tolist(), self.enemyXPositions.tolist()):
+            self.renderBlock(street, enemy_y_position, enemy_x_position, placeOrRemove)
+
+    def enemiesInFront(self):
+        """
+        Return which enemy cars are in front of your car, following the same rules as Env.enemyDistance
+
+        Returns:
+            bool array: True for the enemy cars which are in front of your car
+        """
+        if self.continuousEnv:
+            leftEnemyDistance  = (self.playerPosition - self.enemyXPositions)%self.envWidth - self.carWidth
+            rightEnemyDistance = (self.enemyXPositions - self.playerPosition)%self.envWidth - self.carWidth
+            return np.minimum(leftEnemyDistance, rightEnemyDistance) < 0
+        # in the standard environment, only the distance on the side of the enemy car is meaningful
+        isEnemyLeft = self.enemyXPositions < self.playerPosition
+        enemyDistance = np.where(isEnemyLeft, self.playerPosition - self.enemyXPositions, self.enemyXPositions - self.playerPosition) - self.carWidth
+        return enemyDistance < 0
+
+    def updateReferenceEnemy(self):
+        """
+        Select the enemy car used to compute the state: the lowest enemy car in front of your car or, if there is none,
+        the lowest enemy car. Cars still queued above the environment are considered as if they were in the first row
+        """
+        visibleYPositions = np.maximum(self.enemyYPositions, 0)
+        priority = visibleYPositions + 2*self.envHeight*self.enemiesInFront()
+        reference = np.argmax(priority)
+        self.enemy_x_position = int(self.enemyXPositions[reference])
+        self.enemy_y_position = int(visibleYPositions[reference])
+        self.cachedState = None
+
+    def moveEnemyCar(self, enemyspeed):
+        """
+        Move all the enemy cars along their vertical lines, following the same rules as Env.moveEnemyCar, and return the game status
+
+        Args:
+            enemyspeed: the speed of the enemy cars
+
+        Returns:
+            bool, int: if the game is over (an enemy crashed against the player car) and the score increase (number of enemy cars which exited the environment)
+        """
+        self.renderEnemyCar(0)
+        futurePosition = self.envHeight - (self.enemyYPositions + enemyspeed)
+        # enemies still entirely behind you after moving are simply moved...
+        isBehind = futurePosition >= 2*self.carHeight
+        # ...while the other ones crash if they are in front of your car...
+        isInFront = self.enemiesInFront()
+        if (isInFront & ~isBehind).any():
+            return True, 0
+        # ...are moved if they are still partially in the environment after moving...
+        self.enemyYPositions += enemyspeed
+        # ...or exit the environment: increase the score and queue them after the last enemy car
+        hasExited = futurePosition <= 0
+        nExited = int(np.count_nonzero(hasExited))
+        if nExited > 0:
+            lastPosition = self.enemyYPositions[~hasExited].min(initial=self.enemyGap)
+            self.enemyYPositions[hasExited] = np.minimum(0, lastPosition - self.enemyGap*np.arange(1, nExited + 1))
+            self.enemyXPositions[hasExited] = self.nextSpawnPositions(nExited)
+        self.updateReferenceEnemy()
+        self.renderEnemyCar(1)
+        return False, nExited
+
+    def snapshot(self):
+        """
+        Save the current state of the environment, including the positions of all the enemy cars
+
+        Returns:
+            tuple: the snapshot, to be passed to restore()
+        """
+        return (super().snapshot(), self.enemyXPositions.copy(), self.enemyYPositions.copy())
+
+    def restore(self, snapshot):
+        """
+        Restore a state of the environment saved with snapshot()
+
+        Args:
+            snapshot (tuple): the snapshot to restore
+        """
+        envSnapshot, enemyXPositions, enemyYPositions = snapshot
+        self.enemyXPositions[:] = enemyXPositions
+        self.enemyYPositions[:] = enemyYPositions
+        super().restore(envSnapshot)
+
+    def clone(self):
+        """
+        Build a copy of the environment in its current state, with its own arrays of enemy positions
+
+        Returns:
+            TrafficEnv: the copy of the environment
+        """
+        env = super().clone()
+        env.enemyXPositions = self.enemyXPositions.copy()
+        env.enemyYPositions = self.enemyYPositions.copy()
+        return env
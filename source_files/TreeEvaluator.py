@@ -0,0 +1,62 @@
+import numpy as np
+from deap import gp
+
+def protectedInv(x):
+    """
+    Vectorized version of the protectedInv primitive: 1/x where x is not 0, and 1 elsewhere
+
+    Args:
+        x (np array): the values to invert
+
+    Returns:
+        np array: the inverted values
+    """
+    isNotZero = x != 0
+    return np.where(isNotZero, 1.0/np.where(isNotZero, x, 1), 1)
+
+# Vectorized version of each primitive of the primitive set (see AgentEA.makePrimitiveSet), applied to whole arrays
+vectorizedPrimitives = {
+    "add": np.add,
+    "sub": np.subtract,
+    "mul": np.multiply,
+    "protectedInv": protectedInv,
+    "and_": np.bitwise_and,
+    "or_": np.bitwise_or,
+    "not_": np.logical_not,
+    "if_then_else": np.where,
+    "lt": np.less,
+    "eq": np.equal,
+}
+
+def evaluateTree(tree, pset, states):
+    """
+    Compute the output of a tree in many states at once: the tree is walked once, and each primitive is applied to the
+    arrays of the values of its arguments in all the states. The inputs are converted to float64 (or to bool, for the
+    boolean ones), since integer arrays would wrap around at 2^63 while the compiled tree uses unbounded Python integers:
+    the outputs are then the same as the ones of the compiled tree called on each state, as long as the values of the
+    integer operations do not exceed 2^53 (above which they are not represented exactly by floats)
+
+    Args:
+        tree (PrimitiveTree): the tree to evaluate
+        pset (PrimitiveSetTyped): the primitive set of the tree
+        states (np array): the states, one for each row
+
+    Returns:
+        np array: the output of the tree in each state
+    """
+    stack = []
+    inputs = {}
+    with np.errstate(all="ignore"):
+        # in reversed order, the arguments of each primitive are found on the stack, the first one on top
+        for node in reversed(tree):
+            if isinstance(node, gp.Primitive):
+                arguments = [stack.pop() for _ in range(node.arity)]
+                stack.append(vectorizedPrimitives[node.name](*arguments))
+            elif node.name in pset.arguments:
+                if node.name not in inputs:
+                    index = pset.arguments.index(node.name)
+                    inputs[node.name] = states[:, index].astype(bool if pset.ins[index] is bool else np.float64)
+                stack.append(inputs[node.name])
+            else:
+                stack.append(node.value)
+    return np.broadcast_to(stack.pop(), len(states))
@@ -0,0 +1,215 @@
+import numpy as np
+
+from Config import Config
+from RandomStreams import makeGenerator
+from StateTable import getStateTable
+
+class VecEnv:
+    def __init__(self, nGames, height, width, carHeight, carWidth, seed=None, config=None):
+        """
+        Initialize a batch of nGames independent environments, all with the same height and width of
+        the environment and the same height and width of the cars. Differently from Env, the state of
+        each game (car positions, speeds, counters and scores) is stored in NumPy arrays with one entry
+        per game, so that all the games can be advanced at once with a single call to step().
+        Car position variables refer to the top left corner of the car.
+
+        Args:
+            nGames (int): the number of games to simulate in parallel
+            height (int): the environment height
+            width (int): the environment width
+            carHeight (int): the cars height
+            carWidth (int): the cars width
+            seed (int or np.random.SeedSequence, optional): the seed of the random generator shared by all the games.
+                Defaults to None (spawn a new independent stream from the root one)
+            config (Config, optional): the configuration of the games. Defaults to None (the one set in the Constants file)
+        """
+        self.nGames = nGames
+        self.envHeight = height
+        self.envWidth = width
+        self.carHeight = carHeight
+        self.carWidth = carWidth
+        self.config = config if config is not None else Config()
+        self.stateTable = getStateTable(height, width, carHeight, carWidth, self.config)
+        self.rng = makeGenerator(seed, self.config.SEED)
+        # game status of each environment, as in Game
+        self.score = np.zeros(nGames, dtype=int)
+        self.maxscore = np.zeros(nGames, dtype=int)
+        self.globalReward = np.zeros(nGames, dtype=float)
+        self.carspeed = np.full(nGames, self.config.SPEED, dtype=int)
+        self.enemyspeed = np.full(nGames, self.config.SPEED, dtype=int)
+        self.counter = np.full(nGames, self.config.COUNTER, dtype=int)
+        # car positions
+        self.playerPosition = np.zeros(nGames, dtype=int)
+        self.enemy_x_position = np.zeros(nGames, dtype=int)
+        self.enemy_y_position = np.zeros(nGames, dtype=int)
+        # horizontal displacement (in units of carspeed) of each action: stay, right, left, right with boost, left with boost
+        self.actionDirections = np.array((0, 1, -1, self.config.BOOST, -self.config.BOOST), dtype=int)
+        self.reset()
+
+    def reset(self, seed=None):
+        """
+        Restore the initial state of all the games in place: scores, speeds and counters are reset, your cars
+        are positioned in the center of the last row and new enemy cars are generated
+
+        Args:
+            seed (int or np.random.SeedSequence, optional): the seed used to build a new random generator before generating the enemy cars.
+                Defaults to None (keep the current random generator)
+        """
+        if seed is not None:
+            self.rng = makeGenerator(seed, self.config.SEED)
+        self.score.fill(0)
+        self.maxscore.fill(0)
+        self.globalReward.fill(0)
+        self.carspeed.fill(self.config.SPEED)
+        self.enemyspeed.fill(self.config.SPEED)
+        self.counter.fill(self.config.COUNTER)
+        self.playerPosition.fill((self.envWidth - self.carWidth) // 2)
+        self.generateEnemyCars(np.ones(self.nGames, dtype=bool))
+
+    def generateEnemyCars(self, mask):
+        """
+        Initialize the enemy cars of the selected games in a random position of the first row
+
+        Args:
+            mask (bool array): the games where a new enemy car has to be generated
+        """
+        nNewCars = np.count_nonzero(mask)
+        if nNewCars == 0:
+            return
+        # position enemies in the first row...
+        self.enemy_y_position[mask] = 0
+        maxValidPosition = self.envWidth if self.config.CONTINUOUSENV else self.envWidth - self.carWidth
+        # ... in a random position, drawing all of them at once
+        self.enemy_x_position[mask] = self.rng.integers(maxValidPosition, size=nNewCars)
+
+    def enemyDistance(self):
+        """
+        Return the horizontal distance between a side of your cars and the opposite side of the enemy cars,
+        following the same rules as Env.enemyDistance
+
+        Returns:
+            int array, int array: left and right enemy distance of each game
+        """
+        if self.config.CONTINUOUSENV:
+            leftEnemyDistance  = (self.playerPosition - self.enemy_x_position)%self.envWidth - self.carWidth
+            rightEnemyDistance = (self.enemy_x_position - self.playerPosition)%self.envWidth - self.carWidth
+        else:
+            isEnemyLeft = self.enemy_x_position < self.playerPosition
+            leftEnemyDistance  = np.where(isEnemyLeft, (self.playerPosition - self.enemy_x_position) - self.carWidth, self.envWidth)
+            rightEnemyDistance = np.where(isEnemyLeft, self.envWidth, (self.enemy_x_position - self.playerPosition) - self.carWidth)
+        return leftEnemyDistance, rightEnemyDistance
+
+    def getState(self, out=None):
+        """
+        Return the state of all the environments, extracted from the state lookup table
+
+        Args:
+            out (np array, optional): a (nGames, 5) int matrix where to write the states. Defaults to None (allocate a new matrix)
+
+        Returns:
+            np array: a (nGames, 5) matrix whose rows are the quintuples
+            (enemyInFront, enemyVerticalDistance, enemyLeftOrRight, obstacleLeftDistance, obstacleRightDistance)
+        """
+        return self.stateTable.states(self.playerPosition, self.enemy_x_position, self.enemy_y_position, out=out)
+
+    def moveCars(self, actions):
+        """
+        Move your cars along the horizontal axis, following the given actions, and return the games status
+
+        Args:
+            actions (int array): the action to take in each game
+
+        Returns:
+            bool array: which games are over (car crashed against the wall)
+        """
+        futurePosition = self.playerPosition + self.actionDirections[actions] * self.carspeed
+        if self.config.CONTINUOUSENV:
+            # the car can exit the environment from one side and re-enter from the opposite side
+            self.playerPosition = futurePosition % self.envWidth
+            return np.zeros(self.nGames, dtype=bool)
+        # a car that would exit the environment crashes against the wall and is not moved
+        gameover = (futurePosition < 0) | (futurePosition + self.carWidth > self.envWidth)
+        self.playerPosition = np.where(gameover, self.playerPosition, futurePosition)
+        return gameover
+
+    def moveEnemyCars(self):
+        """
+        Move the enemy cars along their vertical lines, and return the games status
+
+        Returns:
+            bool array, int array: which games are over (enemy crashed against the player car) and the score increases (0 or 1)
+        """
+        futurePosition = self.envHeight - (self.enemy_y_position + self.enemyspeed)
+        # enemies still entirely behind you after moving are simply moved
+        isBehind = futurePosition >= 2*self.carHeight
+        # the other ones crash if they are in front of your car...
+        isInFront = np.minimum(*self.enemyDistance()) < 0
+        gameover = ~isBehind & isInFront
+        # ...are moved if they are still partially in the environment after moving...
+        isMoving = isBehind | (~isInFront & (futurePosition > 0))
+        self.enemy_y_position[isMoving] += self.enemyspeed[isMoving]
+        # ...or exit the environment, increasing the score and generating a new enemy car
+        hasExited = ~isBehind & ~isInFront & (futurePosition <= 0)
+        self.generateEnemyCars(hasExited)
+        return gameover, hasExited.astype(int)
+
+    def step(self, actions):
+        """
+        Apply the given actions to all the games: move all the cars, compute the rewards, update the
+        counters and reset the games that are over, following the same rules of Game.applyAction,
+        Game.getReward, Game.updateCounter and Game.crash
+
+        Args:
+            actions (int array): the action to apply in each game
+
+        Returns:
+            float array, bool array: the reward of each game and which games are over
+        """
+        actions = np.asarray(actions, dtype=int)
+        gameover_wall = self.moveCars(actions)
+        gameover_car, scoreIncrease = self.moveEnemyCars()
+        self.score += scoreIncrease
+        gameOver = gameover_wall | gameover_car
+        # reward in case of no crash, computed as in Game.getReward
+        rewardForEnemy = np.where(np.minimum(*self.enemyDistance()) < 0, -10, 1)
+        if self.config.CONTINUOUSENV:
+            rewardForCenter = 0
+        else:
+            rewardForCenter = 2/(1 + np.abs(self.playerPosition - self.envWidth/2))
+        rewardForMoving = (actions == 0).astype(int)
+        rewardForBoost = np.where((actions == 3) | (actions == 4), -100, 0)
+        rewards = rewardForEnemy + rewardForCenter + rewardForMoving + rewardForBoost
+        rewards = np.where(gameOver, -1000, rewards)
+        # if the score is greater than the max score, the game is over
+        gameOver |= self.score >= self.config.MAXSCORE
+        self.crash(gameOver)
+        self.globalReward += rewards
+        self.updateCounters(gameOver)
+        return rewards, gameOver
+
+    def updateCounters(self, gameOver):
+        """
+        Update the counters and increase enemy speeds if needed
+
+        Args:
+            gameOver (bool array): which games are over
+        """
+        levelUp = self.score == self.counter
+        self.enemyspeed[levelUp] += 1                   # increase the speed
+        self.counter[levelUp] += self.config.COUNTER    # set the next score to be reached to increase the speed
+        self.enemyspeed[gameOver] = self.config.SPEED   # reset the speed
+        self.counter[gameOver] = self.config.COUNTER    # reset the counter
+
+    def crash(self, gameOver):
+        """
+        Save results and reset the environments of the games that are over
+
+        Args:
+            gameOver (bool array): which games are over
+        """
+        # update the max scores
+        np.maximum(self.maxscore, np.where(gameOver, self.score, 0), out=self.maxscore)
+        # reset the environments
+        self.score[gameOver] = 0
+        self.playerPosition[gameOver] = (self.envWidth - self.carWidth) // 2
+        self.generateEnemyCars(gameOver)
@@ -1,57 +1,63 @@
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-
 from Game import Game
 from Env import Env
+from TrafficEnv import TrafficEnv
 from AgentEA import AgentEA
 from AgentRL import AgentRL
-import Constants as C
+from PlotRenderer import PlotRenderer
+from Config import Config
 
 def main():
     """
-    Main function of the game: plays the game and plots/renders the updates 
+    Main function of the game: plays the game and plots/renders the updates, with the configuration set in the Constants file
     """
+    config = Config()
     # build the environment and the agent
-    env = Env(*C.ENVSIZE, *C.CARSIZE)
-    agent = buildAndExtractBestIndividual()
+    # the street matrix has to be kept updated only if it is plotted at each step
+    if config.NENEMIES > 1:
+        env = TrafficEnv(*config.ENVSIZE, *config.CARSIZE, config.NENEMIES, headless=not config.PLOTSTEPS, config=config)
+    else:
+        env = Env(*config.ENVSIZE, *config.CARSIZE, headless=not config.PLOTSTEPS, config=config)
+    agent = buildAndExtractBestIndividual(config)
     # if desired, plot the environment and play the game
-    if C.PLOTSTEPS:
+    if config.PLOTSTEPS:
         game = Game(env, agent) 
-        plt.figure(figsize=C.ENVSIZE)
-        plt.imshow(game.env.street, cmap='gray')
-        _ = FuncAnimation(plt.gcf(), game.playStep, fargs=(), frames=10000000, interval=C.WAIT)
-        plt.show()
+        PlotRenderer(game, config.FRAMESKIP).show()
     # otherwise, just play the game for a number of times
     else:
-        for _ in range(C.NGAMES):
-            game = Game(env, agent)
+        for _ in range(config.NGAMES):
+            # compiled trees are deterministic, hence the steps where they stand still can be skipped
+            game = Game(env, agent, fastForward=config.USEGA)
             game.play()
 
-def buildAndExtractBestIndividual():
+def buildAndExtractBestIndividual(config):
     """
     Build the agent, train it if desired and save it in a file if desired.
 
+    Args:
+        config (Config): the configuration of the agent
+
     Returns:
         AgentRL or compiled DEAP tree: the agent to play the game
     """
     print("Building the agent...")
-    agentClass = AgentEA if C.USEGA else AgentRL
-    agentName = "Genetic Algorithm" if C.USEGA else "Reinforcement Learning"
-    if C.IMPORTAGENT:
+    agentClass = AgentEA if config.USEGA else AgentRL
+    agentName = "Genetic Algorithm" if config.USEGA else "Reinforcement Learning"
+    if config.IMPORTAGENT:
         print("Agent found, importing...")
-        agent = agentClass(C.IMPORTAGENTPATH)
+        agent = agentClass(config.IMPORTAGENTPATH, config=config)
         print("Agent imported")
     else:
         print("No previous agents found, a new agent will be learned using", agentName)
-        agent = agentClass()
+        agent = agentClass(config=config)
         print("Agent learned")
-    if C.EXPORTTREE and C.USEGA:
-        agent.saveTreeImageIn(C.EXPORTTREEPATH)
-    if C.EXPORTAGENT:
-        agent.saveAgentIn(C.EXPORTAGENTPATH)
+    if config.EXPORTTREE and config.USEGA:
+        agent.saveTreeImageIn(config.EXPORTTREEPATH)
+    if config.EXPORTAGENT:
+        agent.saveAgentIn(config.EXPORTAGENTPATH)
     print("Starting the game...")
-    return agent.bestIndividualCompiled if C.USEGA else agent
+    return agent.bestIndividualCompiled if config.USEGA else agent
     
 
 # Let's play!
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,40 @@
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from Config import Config
+from main import buildAndExtractBestIndividual
+
+def runConfig(file):
+    """
+    Build (and train, export, save the scores of) the agent set in a Constants file. The fitness of the individuals
+    is computed in the process itself (NWORKERS=1), since the configurations already run in parallel
+
+    Args:
+        file (string): the path of the Constants file
+
+    Returns:
+        string: the path of the Constants file
+    """
+    buildAndExtractBestIndividual(Config.fromFile(file).replace(NWORKERS=1))
+    return file
+
+def sweep(searchDir="scores"):
+    """
+    Run all the configurations saved in the Constants files inside a folder (e.g. the ones in scores/AgentGA), in a
+    pool of processes (one for each core), without moving the files into source_files and starting a new interpreter
+    for each of them
+
+    Args:
+        searchDir (string, optional): the folder where to search the Constants files. Defaults to "scores"
+    """
+    files = sorted(glob.glob(searchDir + "/**/Constants.py", recursive=True))
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        for file in pool.map(runConfig, files):
+            print("Done with", file)
+
+
+# Run it from the main folder of the project, e.g. python source_files/sweep.py scores/AgentGA
+if __name__ == "__main__":
+    sweep(*sys.argv[1:])
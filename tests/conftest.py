@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules of the project import each other by name, as when they are run from the source_files folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "source_files"))
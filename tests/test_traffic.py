@@ -0,0 +1,22 @@
+import numpy as np
+
+from Config import Config
+from Game import Game
+from TrafficEnv import TrafficEnv
+
+def test_speed_increases_when_many_enemies_exit_in_one_step(tmp_path):
+    config = Config(ENVSIZE=(10, 10), CARSIZE=(2, 2), SPEED=1, COUNTER=2, MAXSCORE=1000, USEGA=True,
+                    STATETABLEPATH=str(tmp_path) + "/")
+    env = TrafficEnv(*config.ENVSIZE, *config.CARSIZE, nEnemies=5, headless=True, seed=0, config=config)
+    game = Game(env, lambda *state: 0, training=True)
+    # three enemy cars far from your car exit the environment in the same step, the other two are still queued
+    env.playerPosition = 0
+    env.enemyXPositions[:] = 8
+    env.enemyYPositions[:] = [9, 8, 7, -2, -4]
+    game.enemyspeed = 3
+    game.playStep(None)
+    assert not game.gameOver
+    assert game.score == 3
+    # the score jumped past the counter (2): the enemy cars are faster, and the next threshold is after the score
+    assert game.enemyspeed == 4
+    assert game.counter == 4
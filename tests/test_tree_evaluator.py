@@ -0,0 +1,32 @@
+import random
+
+import numpy as np
+from deap import gp
+
+from AgentEA import makePrimitiveSet
+from TreeEvaluator import evaluateTree
+
+def compiledOutputs(tree, pset, states):
+    function = gp.compile(tree, pset)
+    return np.array([float(function(*state)) for state in states.tolist()])
+
+def randomStates(rng, nStates, maxValue):
+    states = rng.integers(-maxValue, maxValue + 1, size=(nStates, 5))
+    # the first and the third elements of the state are booleans
+    states[:, [0, 2]] = rng.integers(2, size=(nStates, 2))
+    return states
+
+def test_evaluate_tree_matches_compiled_tree():
+    pset = makePrimitiveSet()
+    random.seed(0)
+    states = randomStates(np.random.default_rng(0), 50, 5)
+    for _ in range(300):
+        tree = gp.PrimitiveTree(gp.genHalfAndHalf(pset, min_=1, max_=4))
+        np.testing.assert_array_equal(evaluateTree(tree, pset, states), compiledOutputs(tree, pset, states), err_msg=str(tree))
+
+def test_evaluate_tree_does_not_wrap_around_int64():
+    pset = makePrimitiveSet()
+    # 2^30 * 2^30 * 2^30 = 2^90 does not fit in an int64, but it is an exact float
+    tree = gp.PrimitiveTree.from_string("mul(mul(IN3, IN3), IN3)", pset)
+    states = np.array([[0, 0, 0, 2**30, 0], [1, 0, 1, -2**30, 0]])
+    np.testing.assert_array_equal(evaluateTree(tree, pset, states), compiledOutputs(tree, pset, states))